@@ -0,0 +1,192 @@
+import os
+import json
+import hashlib
+from auxiliary_functions import *
+
+# Bump when the preprocessing changes, so older cache files are not reused
+CACHE_VERSION = 1
+
+# Folder for the preprocessed instance files
+INSTANCE_CACHE_DIR = '.instance_cache'
+
+
+def instance_cache_key(path, sheet_name, schedule_date, list_workcenters, dict_machines, dict_machine_turns, time_for_turn):
+    """
+    Hash of everything the preprocessed instance depends on: the content of the order
+    book file and the machine/shift settings.
+
+    Returns:
+        Hexadecimal key
+    """
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+
+    settings = {
+        'version': CACHE_VERSION,
+        'sheet_name': sheet_name,
+        'schedule_date': str(pd.to_datetime(schedule_date)),
+        'workcenters': list(list_workcenters),
+        'machines': dict_machines,
+        'machine_turns': dict_machine_turns,
+        'time_for_turn': time_for_turn
+    }
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+
+    return digest.hexdigest()
+
+def _dict_columns(dictionary, n_keys):
+    """Splits a dictionary with tuple keys into key columns plus a value column (insertion order kept)."""
+    keys = list(dictionary.keys())
+    columns = [np.array([key[i] for key in keys], dtype=str) for i in range(n_keys)]
+    return columns + [np.array(list(dictionary.values()))]
+
+def _columns_dict(*columns):
+    """Inverse of _dict_columns."""
+    *keys, values = [column.tolist() for column in columns]
+    return dict(zip(zip(*keys), values))
+
+def save_instance_cache(path, jobs_list, production_goals, quantities_dict, workcenter_assignments,
+                        due_dates_dict, priority_weights_dict, dict_setup_matrices,
+                        dict_processing_time, dict_eligibility):
+    """
+    Writes the preprocessed instance to a .npz file (plain arrays, no pickling).
+
+    The file is written under a temporary name and then renamed, so parallel processes
+    never read a partial cache.
+    """
+    goal_job, goal_wc, goal = _dict_columns(production_goals, 2)
+    arrays = {
+        'jobs': np.array(list(jobs_list), dtype=str),
+        'goal_job': goal_job,
+        'goal_wc': goal_wc,
+        'goal': goal,
+        'quantity': np.array([quantities_dict[key] for key in production_goals]),
+        'assignment_wc': np.array([wc for wc, jobs in workcenter_assignments.items() for _ in jobs], dtype=str),
+        'assignment_job': np.array([job for jobs in workcenter_assignments.values() for job in jobs], dtype=str),
+        'due_job': np.array(list(due_dates_dict.keys()), dtype=str),
+        'due_date': np.array(list(due_dates_dict.values())),
+        'weight_job': np.array(list(priority_weights_dict.keys()), dtype=str),
+        'weight': np.array(list(priority_weights_dict.values())),
+        'setup_wc': np.array(list(dict_setup_matrices.keys()), dtype=str)
+    }
+
+    # Setup model: job → class index and (machine × class × class) table per workcenter
+    for w, matrix in enumerate(dict_setup_matrices.values()):
+        arrays[f'setup_job_{w}'] = np.array(list(matrix.job_class.keys()), dtype=str)
+        arrays[f'setup_class_{w}'] = np.array(list(matrix.job_class.values()), dtype=np.int64)
+        arrays[f'setup_machines_{w}'] = np.array(matrix.machines, dtype=str)
+        arrays[f'setup_table_{w}'] = matrix.table
+
+    (arrays['time_job'], arrays['time_wc'], arrays['time_machine'],
+     arrays['processing_time']) = _dict_columns(dict_processing_time, 3)
+    arrays['eligibility_job'], arrays['eligibility_machine'], arrays['eligibility'] = _dict_columns(dict_eligibility, 2)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as file:
+        np.savez(file, **arrays)
+    os.replace(temporary_path, path)
+
+def load_instance_cache(path):
+    """
+    Reads a file written by save_instance_cache.
+
+    Returns:
+        tuple: (jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict,
+                priority_weights_dict, dict_setup_matrices, dict_processing_time, dict_eligibility)
+    """
+    import pandas as pd
+
+    with np.load(path, allow_pickle=False) as arrays:
+        # Same construction as extract_gross_data, so jobs_list has the same array type
+        jobs_list = pd.array(pd.Series(arrays['jobs'].tolist()).astype(str).unique())
+
+        production_goals = _columns_dict(arrays['goal_job'], arrays['goal_wc'], arrays['goal'])
+        quantities_dict = _columns_dict(arrays['goal_job'], arrays['goal_wc'], arrays['quantity'])
+
+        workcenter_assignments = {}
+        for wc, job in zip(arrays['assignment_wc'].tolist(), arrays['assignment_job'].tolist()):
+            workcenter_assignments.setdefault(wc, set()).add(job)
+
+        due_dates_dict = dict(zip(arrays['due_job'].tolist(), arrays['due_date'].tolist()))
+        priority_weights_dict = dict(zip(arrays['weight_job'].tolist(), arrays['weight'].tolist()))
+
+        dict_setup_matrices = {}
+        for w, wc in enumerate(arrays['setup_wc'].tolist()):
+            job_class = dict(zip(arrays[f'setup_job_{w}'].tolist(), arrays[f'setup_class_{w}'].tolist()))
+            dict_setup_matrices[wc] = SetupMatrix(job_class, arrays[f'setup_machines_{w}'].tolist(), arrays[f'setup_table_{w}'])
+
+        dict_processing_time = _columns_dict(arrays['time_job'], arrays['time_wc'], arrays['time_machine'], arrays['processing_time'])
+        dict_eligibility = _columns_dict(arrays['eligibility_job'], arrays['eligibility_machine'], arrays['eligibility'])
+
+    return (
+        jobs_list,
+        production_goals,
+        quantities_dict,
+        workcenter_assignments,
+        due_dates_dict,
+        priority_weights_dict,
+        dict_setup_matrices,
+        dict_processing_time,
+        dict_eligibility
+    )
+
+def load_problem_data(path=path_jobs, sheet_name=sheet_jobs, schedule_date=schedule_date,
+                      list_workcenters=list_workcenters, dict_machines=dict_machines,
+                      dict_machine_turns=dict_machine_turns, time_for_turn=time_for_turn,
+                      cache_dir=INSTANCE_CACHE_DIR):
+    """
+    Returns the preprocessed instance, reading the order book only when it is not cached.
+
+    On a cache miss the Excel file goes through preprocess_raw_data, extract_gross_data,
+    setup_model, processing_time and eligibility, and the result is saved to cache_dir
+    under a key of the file content and settings (see instance_cache_key). Later runs
+    with the same inputs load the arrays directly. Use cache_dir=None to disable the cache.
+
+    Returns:
+        tuple: (jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict,
+                priority_weights_dict, dict_setup_matrices, dict_processing_time, dict_eligibility)
+    """
+    # 1. Cache lookup
+    cache_path = None
+    if cache_dir is not None:
+        key = instance_cache_key(path, sheet_name, schedule_date, list_workcenters, dict_machines, dict_machine_turns, time_for_turn)
+        cache_path = os.path.join(cache_dir, f"instance_{key[:24]}.npz")
+        if os.path.exists(cache_path):
+            return load_instance_cache(cache_path)
+
+    # 2. Full preprocessing
+    import pandas as pd
+
+    raw_data_df = pd.read_excel(path, sheet_name=sheet_name)
+    processed_df = preprocess_raw_data(raw_data_df, schedule_date)
+
+    jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict = extract_gross_data(processed_df)
+    dict_setup_matrices = setup_model(processed_df, list_workcenters, dict_machines, dict_machine_turns, time_for_turn)
+    dict_processing_time = processing_time(list_workcenters, dict_machines, dict_machine_turns, time_for_turn, quantities_dict, production_goals, workcenter_assignments)
+    dict_eligibility = eligibility(processed_df, list_workcenters, dict_machines)
+
+    problem_data = (
+        jobs_list,
+        production_goals,
+        quantities_dict,
+        workcenter_assignments,
+        due_dates_dict,
+        priority_weights_dict,
+        dict_setup_matrices,
+        dict_processing_time,
+        dict_eligibility
+    )
+
+    # 3. Save for the next runs
+    if cache_path is not None:
+        save_instance_cache(cache_path, *problem_data)
+
+    return problem_data
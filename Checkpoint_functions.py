@@ -0,0 +1,90 @@
+import os
+import json
+import random
+import numpy as np
+from Instance_functions import *
+
+
+def save_checkpoint(path, instance, generation, population, best_individual=None, statistics=None, **values):
+    """
+    Saves the state of a GA run to a compressed .npz file.
+
+    The population and the best individual are stored as encoded job indices, together
+    with the state of the random and numpy.random generators, so a resumed run continues
+    exactly as the interrupted one would have. The file is written under a temporary name
+    and then renamed, so a run killed while saving keeps the previous checkpoint.
+
+    Args:
+        path: Checkpoint file (.npz)
+        instance: ProblemInstance
+        generation: Number of generations completed
+        population: List of individuals {(wc, machine): [jobs]}
+        best_individual: Optional best individual found so far
+        statistics: Optional StatisticsSink with the statistics so far
+        values: Other values of the run (temperature, stagnation counter, best fitness, ...),
+            any JSON serializable value
+    """
+    index_dtype = np.int16 if len(instance.jobs) < np.iinfo(np.int16).max else np.int32
+
+    # 1. Random generators
+    python_version, python_state, python_gauss = random.getstate()
+    numpy_name, numpy_keys, numpy_position, numpy_has_gauss, numpy_gauss = np.random.get_state()
+
+    arrays = {
+        'population': encode_population(population, instance).astype(index_dtype),
+        'python_random': np.array(python_state, dtype=np.uint32),
+        'numpy_random': np.asarray(numpy_keys, dtype=np.uint32)
+    }
+    if best_individual is not None:
+        arrays['best_individual'] = encode_population([best_individual], instance).astype(index_dtype)
+
+    # 2. Scalars and statistics (JSON text)
+    state = {
+        'generation': generation,
+        'values': values,
+        'python_random': [python_version, python_gauss],
+        'numpy_random': [numpy_name, int(numpy_position), int(numpy_has_gauss), float(numpy_gauss)],
+        'statistics': [] if statistics is None else statistics.to_frame().to_dict('records')
+    }
+    arrays['state'] = np.array(json.dumps(state, default=lambda value: value.item()))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as file:
+        np.savez_compressed(file, **arrays)
+    os.replace(temporary_path, path)
+
+def load_checkpoint(path, instance, restore_random_state=True):
+    """
+    Reads a checkpoint written by save_checkpoint.
+
+    Args:
+        path: Checkpoint file (.npz)
+        instance: ProblemInstance
+        restore_random_state: If True, random and numpy.random continue from the saved state
+
+    Returns:
+        Dictionary with 'generation', 'population', 'best_individual' (or None),
+        'statistics' (list of records) and the saved values
+    """
+    with np.load(path, allow_pickle=False) as arrays:
+        state = json.loads(arrays['state'].item())
+        checkpoint = dict(state['values'])
+        checkpoint['generation'] = state['generation']
+        checkpoint['statistics'] = state['statistics']
+        checkpoint['population'] = decode_population(arrays['population'], instance)
+        checkpoint['best_individual'] = (
+            decode_population(arrays['best_individual'], instance)[0] if 'best_individual' in arrays else None
+        )
+
+        if restore_random_state:
+            python_version, python_gauss = state['python_random']
+            random.setstate((python_version, tuple(arrays['python_random'].tolist()), python_gauss))
+
+            numpy_name, numpy_position, numpy_has_gauss, numpy_gauss = state['numpy_random']
+            np.random.set_state((numpy_name, arrays['numpy_random'], numpy_position, numpy_has_gauss, numpy_gauss))
+
+    return checkpoint
@@ -1,26 +1,98 @@
 import random
+import numpy as np
 from copy import deepcopy
 from collections import Counter, defaultdict
+from Instance_functions import build_eligibility_index
 
-def ox_crossover(selection, dict_eligibility, jobs_list, offspring_size):
+def _eligibility_index(eligibility_dict, machines, instance):
+    """
+    Eligibility index of the crossovers: the one of the instance, built once, or one built
+    from eligibility_dict for the given (wc, machine) keys.
+
+    Returns:
+        tuple: (machine keys, {(job, wc): [machine positions]}, {wc: set of eligible jobs})
+    """
+    if instance is not None:
+        return instance.machines, instance.eligible_indices, instance.eligible_jobs
+
+    machines = list(machines)
+    return (machines,) + build_eligibility_index(eligibility_dict, machines)
+
+def _repair_segments(offspring, segments, machines, eligible_indices, job_index, state):
+    """
+    Repairs one workcenter of an OX offspring touching only the exchanged segments.
+
+    The offspring starts as a copy of parent 1 (each job of the workcenter once) with the
+    segments cut off, so only the jobs of the segments can be repeated or missing: an
+    incoming job is kept if it was taken out by a segment (once), and jobs taken out and
+    not brought back go to their least-loaded eligible machine.
+
+    Args:
+        offspring: {(wc, machine): [jobs]}, modified in place
+        segments: List of ((wc, machine), jobs taken out, jobs coming in), same workcenter
+        machines: Machine keys of the eligibility index
+        eligible_indices: {(job, wc): [positions in machines]}
+        job_index: {job: position in 'state'}
+        state: bytearray over the job indices, all zero (left all zero on return)
+    """
+    workcenter = segments[0][0][0]
+
+    # 1. Jobs taken out of the offspring
+    for _, removed, _ in segments:
+        for job in removed:
+            state[job_index[job]] = 1
+
+    # 2. Incoming jobs: only the ones taken out, and only once
+    for key, _, added in segments:
+        jobs = offspring[key]
+        for job in added:
+            j = job_index[job]
+            if state[j] == 1:
+                state[j] = 2
+                jobs.append(job)
+
+    # 3. Jobs not brought back: least-loaded eligible machine (or the machine they came from)
+    load = {key: len(jobs) for key, jobs in offspring.items() if key[0] == workcenter}
+    for key, removed, _ in segments:
+        for job in removed:
+            j = job_index[job]
+            if state[j] == 1:
+                available_machines = [
+                    machines[m] for m in eligible_indices.get((job, workcenter), ())
+                    if machines[m] in load
+                ] or [key]
+                allocation_machine = min(available_machines, key=load.__getitem__)
+                offspring[allocation_machine].append(job)
+                load[allocation_machine] += 1
+            state[j] = 0
+
+def ox_crossover(selection, dict_eligibility, jobs_list, offspring_size, instance=None):
     """
     Generates a population of offspring using OX crossover between selected parents.
+
+    The tail of each selected machine is replaced by the tail of parent 2 from a random
+    cut point, and each changed workcenter is repaired once (_repair_segments), tracking
+    the jobs of the segments in a bytearray over the job indices. The cost per offspring
+    is the copy of parent 1 plus the length of the exchanged segments.
     
     Args:
         selection: List of available parents for selection
         dict_eligibility: Eligibility dictionary in format {(job, machine): 1/0}
         jobs_list: List of all jobs that should be considered
         offspring_size: Number of offspring to generate
+        instance: Optional ProblemInstance with the eligibility index
         
     Returns:
         List of generated offspring
     """
     
-    # Preprocessing eligibility dictionary
-    preprocessed_eligibility = {}
-    for (job, machine), eligible in dict_eligibility.items():
-        if eligible == 1:
-            preprocessed_eligibility.setdefault(job, []).append(machine)
+    # Eligibility index (already built once by the instance)
+    machines, eligible_indices, _ = _eligibility_index(
+        dict_eligibility, dict.fromkeys(key for parent in selection for key in parent), instance)
+
+    # Job state bitmap (parents hold jobs of jobs_list, or of the instance)
+    job_index = instance.job_index if instance is not None else {job: i for i, job in enumerate(jobs_list)}
+    state = bytearray(len(job_index))
     
     pop_offspring = []
     
@@ -42,141 +114,301 @@ def ox_crossover(selection, dict_eligibility, jobs_list, offspring_size):
             n_tuples = random.randint(1, max(1, len(valid_machines)-1))
             selected_tuples = random.sample(valid_machines, n_tuples)
             
+            segments = {}
             for (workcenter, machine) in selected_tuples:
                 # Random cut point
-                c1 = random.randint(1, len(parent1[(workcenter, machine)]) - 1)
-                offspring[(workcenter, machine)][c1:] = parent2[(workcenter, machine)][c1:]
-                
-                # Process workcenter to remove duplicates
-                workcenter_machines = [k for k in parent1 if k[0] == workcenter]
-                jobs_in_workcenter = set()
-                
-                for (wc, machine) in workcenter_machines:
-                    jobs_on_machine = offspring[(wc, machine)].copy()
-                    new_jobs = []
-                    
-                    for job in jobs_on_machine:
-                        if job not in jobs_in_workcenter:
-                            new_jobs.append(job)
-                            jobs_in_workcenter.add(job)
-                    
-                    offspring[(wc, machine)] = new_jobs
-                
-                # Allocate missing jobs
-                missing_jobs = [job for job in jobs_list if job not in jobs_in_workcenter]
-                
-                for job in missing_jobs:
-                    eligible_machines = preprocessed_eligibility.get(job, [])
-                    available_machines = [
-                        machine for machine in eligible_machines 
-                        if (workcenter, machine) in offspring
-                    ]
-                    
-                    if available_machines:
-                        # Choose machine with least load
-                        allocation_machine = min(
-                            available_machines,
-                            key=lambda machine: len(offspring[(workcenter, machine)])
-                        )
-                        offspring[(workcenter, allocation_machine)].append(job)
+                key = (workcenter, machine)
+                c1 = random.randint(1, len(parent1[key]) - 1)
+                segments.setdefault(workcenter, []).append((key, parent1[key][c1:], parent2[key][c1:]))
+                del offspring[key][c1:]
+            
+            # Remove duplicates and allocate missing jobs, once per workcenter
+            for workcenter_segments in segments.values():
+                _repair_segments(offspring, workcenter_segments, machines, eligible_indices, job_index, state)
         
         pop_offspring.append(offspring)
     
     return pop_offspring
 
-def pmx_crossover(parent_1, parent_2, eligibility_dict, jobs_list, n_tuples=2, verbose=False):
+def _pmx_child(template, donor, cuts, machines, eligible_indices, expected_jobs, verbose=False):
     """
-    Optimized PMX crossover version for hierarchical scheduling.
-    
+    One PMX child: the template with the donor segments, repaired.
+
     Args:
-        parent_1, parent_2: Dictionaries {(wc, machine): [jobs]}
-        eligibility_dict: {(job, machine): 1 or 0}
-        jobs_list: List of all jobs
-        n_tuples: Number of tuples for crossover
+        template: Parent copied into the child {(wc, machine): [jobs]}
+        donor: Parent giving the segments
+        cuts: List of ((wc, machine), c1, c2) segments
+        machines, eligible_indices: Eligibility index (_eligibility_index)
+        expected_jobs: {wc: [jobs that must be in wc]} in allocation order
         verbose: Detailed logging mode
-        
+
     Returns:
-        Dictionary with generated child
+        Dictionary with the child
     """
-    # 1. Initial preprocessing
-    child = {k: v.copy() for k, v in parent_2.items()}
-    expected_jobs = set(map(int, jobs_list))
-    
-    # 2. Optimized selection of tuples for crossover
-    common_tuples = [k for k in parent_1 if k in parent_2]
-    selected_tuples = random.sample(common_tuples, min(n_tuples, len(common_tuples))) if common_tuples else []
-    
-    if verbose:
-        print(f"Tuples selected for crossover: {selected_tuples}")
+    child = {k: v.copy() for k, v in template.items()}
 
-    # 3. Processing selected tuples
-    for tuple_key in selected_tuples:
-        parent_jobs = parent_1[tuple_key]
-        if len(parent_jobs) < 2:
-            continue
-            
-        # Selection of cut points
-        c1, c2 = sorted(random.sample(range(len(parent_jobs)), 2))
-        
-        # PMX crossover application
+    # 1. Segments of the donor
+    for tuple_key, c1, c2 in cuts:
+        parent_jobs = donor[tuple_key]
         child[tuple_key][c1:c2+1] = parent_jobs[c1:c2+1]
-        
-        # Treatment of repeated jobs
+
+        # Repeated jobs of the machine replaced by donor jobs it does not hold
         current_jobs = child[tuple_key]
         counter = Counter(current_jobs)
-        
-        # Optimized replacement of duplicates
         if len(counter) < len(current_jobs):
-            available_jobs = [j for j in parent_jobs if j not in current_jobs]
-            if available_jobs:
-                for job, count in counter.items():
-                    if count > 1 and available_jobs:
-                        idx = current_jobs.index(job)
-                        current_jobs[idx] = available_jobs.pop()
-
-    # 4. Optimized duplicate removal
+            available_jobs = [j for j in parent_jobs if j not in counter]
+            first_position = {}
+            for i, job in enumerate(current_jobs):
+                first_position.setdefault(job, i)
+            for job, count in counter.items():
+                if count > 1 and available_jobs:
+                    current_jobs[first_position[job]] = available_jobs.pop()
+
+    # 2. Duplicate removal across the machines of each workcenter
     wc_jobs = defaultdict(set)
-    
-    # First pass: identify existing allocations
     for (wc, machine), jobs in child.items():
         unique_jobs = []
+        seen = wc_jobs[wc]
         for job in jobs:
-            if job not in wc_jobs[wc]:
+            if job not in seen:
                 unique_jobs.append(job)
-                wc_jobs[wc].add(job)
+                seen.add(job)
         child[(wc, machine)] = unique_jobs
 
-    # 5. Optimized allocation of missing jobs
-    # Pre-computation of eligible machines per job
-    job_machines = defaultdict(list)
-    for (job, machine), eligible in eligibility_dict.items():
-        if eligible == 1:
-            job_machines[job].append(machine)
-    
-    # Efficient allocation
-    for wc in set(wc for wc, _ in child.keys()):
-        # Expected jobs in this WC
-        wc_jobs_expected = {j for j in expected_jobs 
-                           if any((wc, m) in child for m in job_machines.get(j, []))}
-        
-        # Missing jobs
-        missing = wc_jobs_expected - wc_jobs[wc]
-        
-        for job in missing:
-            eligible_machines = [m for m in job_machines.get(job, []) 
-                               if (wc, m) in child]
-            
+    # 3. Missing jobs to the least-loaded eligible machine
+    for wc in dict.fromkeys(wc for wc, _ in child):
+        seen = wc_jobs[wc]
+        for job in expected_jobs.get(wc, ()):
+            if job in seen:
+                continue
+            eligible_machines = [machines[m] for m in eligible_indices[(job, wc)] if machines[m] in child]
+
             if eligible_machines:
-                # Select machine with least load
-                target_machine = min(eligible_machines, 
-                                   key=lambda m: len(child.get((wc, m), [])))
-                
-                child.setdefault((wc, target_machine), []).append(job)
-                wc_jobs[wc].add(job)
-                
+                target_machine = min(eligible_machines, key=lambda key: len(child[key]))
+                child[target_machine].append(job)
+                seen.add(job)
+
                 if verbose:
-                    print(f"Allocated job {job} on machine {target_machine}")
+                    print(f"Allocated job {job} on machine {target_machine[1]}")
             elif verbose:
                 print(f"WARNING: Job {job} without eligible machines in WC {wc}")
 
-    return child
\ No newline at end of file
+    return child
+
+def _pmx_pair_children(parent_1, parent_2, n_children, n_tuples, machines, eligible_indices, expected_jobs, verbose=False):
+    """
+    Children of a parent pair, two per set of cut points: parent 2 with the segments of
+    parent 1, and parent 1 with the same segments of parent 2.
+    """
+    common_tuples = [k for k in parent_1 if k in parent_2]
+
+    children = []
+    while len(children) < n_children:
+        # Machines and cut points shared by the two children of this draw
+        selected_tuples = random.sample(common_tuples, min(n_tuples, len(common_tuples))) if common_tuples else []
+        if verbose:
+            print(f"Tuples selected for crossover: {selected_tuples}")
+
+        cuts = []
+        for tuple_key in selected_tuples:
+            if len(parent_1[tuple_key]) < 2:
+                continue
+            c1, c2 = sorted(random.sample(range(len(parent_1[tuple_key])), 2))
+            cuts.append((tuple_key, c1, c2))
+
+        children.append(_pmx_child(parent_2, parent_1, cuts, machines, eligible_indices, expected_jobs, verbose))
+        if len(children) < n_children:
+            children.append(_pmx_child(parent_1, parent_2, cuts, machines, eligible_indices, expected_jobs, verbose))
+
+    return children
+
+def _pmx_context(eligibility_dict, jobs_list, parents, instance):
+    """Eligibility index and expected jobs per workcenter, shared by all the children of a call."""
+    machines, eligible_indices, eligible_jobs = _eligibility_index(
+        eligibility_dict, dict.fromkeys(key for parent in parents for key in parent), instance)
+    expected_jobs = {
+        wc: [job for job in jobs_list if job in wc_jobs]
+        for wc, wc_jobs in eligible_jobs.items()
+    }
+    return machines, eligible_indices, expected_jobs
+
+def pmx_crossover(parent_1, parent_2, eligibility_dict, jobs_list, n_tuples=2, verbose=False, instance=None, n_children=None):
+    """
+    Optimized PMX crossover version for hierarchical scheduling.
+
+    With n_children, the children are built in one pass: every draw of machines and cut
+    points gives two children (parent 2 with the segments of parent 1 and the reverse),
+    and the eligibility index and expected jobs are computed once for all of them.
+    
+    Args:
+        parent_1, parent_2: Dictionaries {(wc, machine): [jobs]}
+        eligibility_dict: {(job, machine): 1 or 0}
+        jobs_list: List of all jobs (IDs of any hashable type, as in the individuals)
+        n_tuples: Number of tuples for crossover
+        verbose: Detailed logging mode
+        instance: Optional ProblemInstance with the eligibility index
+        n_children: Optional number of children
+        
+    Returns:
+        Dictionary with generated child, or a list of n_children children if n_children is given
+    """
+    machines, eligible_indices, expected_jobs = _pmx_context(eligibility_dict, jobs_list, (parent_1, parent_2), instance)
+    children = _pmx_pair_children(parent_1, parent_2, 1 if n_children is None else n_children, n_tuples,
+                                  machines, eligible_indices, expected_jobs, verbose)
+
+    return children[0] if n_children is None else children
+
+def pmx_crossover_population(selection, eligibility_dict, jobs_list, n_tuples=2, instance=None, children_per_pair=2):
+    """
+    PMX over a whole mating pool: consecutive parents (0, 1), (2, 3), ... each give
+    children_per_pair children, sharing one eligibility index and expected job lists.
+
+    Args:
+        selection: List of selected parents
+        eligibility_dict: {(job, machine): 1 or 0}
+        jobs_list: List of all jobs
+        n_tuples: Number of tuples for crossover
+        instance: Optional ProblemInstance with the eligibility index
+        children_per_pair: Children of each parent pair
+
+    Returns:
+        List of children
+    """
+    machines, eligible_indices, expected_jobs = _pmx_context(eligibility_dict, jobs_list, selection, instance)
+
+    offspring = []
+    for i in range(0, len(selection)-1, 2):
+        offspring.extend(_pmx_pair_children(selection[i], selection[i+1], children_per_pair, n_tuples,
+                                            machines, eligible_indices, expected_jobs))
+    return offspring
+
+def _cx_genome(parent, keys, workcenter_number, job_index, n_jobs):
+    """
+    Genome of a parent: its machine sequences concatenated in the order of keys, as gene
+    ids (workcenter number * n_jobs + job index, unique per operation) and machine positions.
+    """
+    lengths = [len(parent.get(key, ())) for key in keys]
+    genes = np.fromiter(
+        (workcenter_number[key[0]] * n_jobs + job_index[job] for key in keys for job in parent.get(key, ())),
+        dtype=np.int64, count=sum(lengths))
+    genes_machines = np.repeat(np.arange(len(keys)), lengths)
+    return genes, genes_machines
+
+def _cx_cycles(sequence_1, sequence_2, position, start):
+    """
+    Alternating cycle labels of two sequences of the same genes.
+
+    The cycles of the permutation i -> position of sequence_1[i] in sequence_2 are walked
+    once each from a visited array, starting at 'start' and wrapping around, so every
+    position is visited once (O(n)) and the cycles are numbered in order of discovery.
+
+    Returns:
+        Boolean array, True where the child takes the gene of parent 1 (even cycles),
+        or None if the sequences do not hold the same genes
+    """
+    n = len(sequence_1)
+    if n != len(sequence_2):
+        return None
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    # 1. Position lookup of parent 2
+    position[sequence_2] = np.arange(n)
+    successor = position[sequence_1]
+    position[sequence_2] = -1
+    if successor.min() < 0 or np.bincount(successor, minlength=n).max() > 1:
+        return None
+
+    # 2. One walk per cycle, parent 1 on the even ones
+    successor = successor.tolist()
+    from_parent_1 = bytearray(n)
+    visited = bytearray(n)
+    take = 1
+    for first in (*range(start, n), *range(start)):
+        if visited[first]:
+            continue
+        i = first
+        while not visited[i]:
+            visited[i] = 1
+            from_parent_1[i] = take
+            i = successor[i]
+        take ^= 1
+
+    return np.frombuffer(from_parent_1, dtype=bool)
+
+def _cx_children(genome_1, genome_2, keys, jobs, position, start=0):
+    """
+    The two CX children of two parent genomes.
+
+    Alternate cycles take the genes of parent 1 and parent 2. A cycle can span
+    workcenters when the parents load their machines differently, but every gene id
+    (workcenter and job) is unique and keeps its own machine, so each child holds every
+    operation once, on a machine that was eligible in one of the parents. Parents that
+    do not hold the same operations are returned unchanged.
+    """
+    sequence_1, machines_1 = genome_1
+    sequence_2, machines_2 = genome_2
+
+    from_parent_1 = _cx_cycles(sequence_1, sequence_2, position, start)
+    if from_parent_1 is None:
+        genes = [(sequence_1, machines_1), (sequence_2, machines_2)]
+    else:
+        genes = [
+            (np.where(from_parent_1, sequence_1, sequence_2), np.where(from_parent_1, machines_1, machines_2)),
+            (np.where(from_parent_1, sequence_2, sequence_1), np.where(from_parent_1, machines_2, machines_1))
+        ]
+
+    # Machine sequences in genome order
+    children = []
+    for sequence, genes_machines in genes:
+        order = np.argsort(genes_machines, kind='stable')
+        ends = np.cumsum(np.bincount(genes_machines, minlength=len(keys))).tolist()
+        child_jobs = jobs[sequence[order] % len(jobs)].tolist()
+        children.append({key: child_jobs[first:last] for key, first, last in zip(keys, [0] + ends[:-1], ends)})
+    return children
+
+def cx_crossover_population(selection, jobs_list, instance=None):
+    """
+    Cycle crossover (CX) over a whole mating pool: consecutive parents (0, 1), (2, 3), ...
+    each give two complementary children.
+
+    A parent is a genome: its machine sequences concatenated in a fixed machine order, as
+    integer gene ids (one per workcenter and job). CX keeps every gene (job and machine) at
+    its position in one of the parents, so the children hold each job of every workcenter
+    once, on an eligible machine, without repair. The cycles are found with position
+    lookup arrays (_cx_cycles). The cycle numbering starts at a random position, so a pair
+    selected twice can give different children.
+
+    Args:
+        selection: List of selected parents {(wc, machine): [jobs]}
+        jobs_list: List of all jobs (parents hold jobs of jobs_list, or of the instance)
+        instance: Optional ProblemInstance (job indices of the instance)
+
+    Returns:
+        List of children
+    """
+    if not selection:
+        return []
+
+    job_ids = instance.jobs if instance is not None else list(jobs_list)
+    job_index = instance.job_index if instance is not None else {job: i for i, job in enumerate(job_ids)}
+    jobs = np.empty(len(job_ids), dtype=object)
+    jobs[:] = job_ids
+
+    # Same machine order for all the genomes
+    keys = list(selection[0])
+    workcenter_number = {wc: w for w, wc in enumerate(dict.fromkeys(wc for wc, _ in keys))}
+    position = np.full(len(workcenter_number) * len(job_ids), -1, dtype=np.int64)
+
+    # Genomes of the distinct parents (selection repeats individuals)
+    genomes = {}
+    for parent in selection:
+        if id(parent) not in genomes:
+            genomes[id(parent)] = _cx_genome(parent, keys, workcenter_number, job_index, len(job_ids))
+
+    offspring = []
+    for i in range(0, len(selection)-1, 2):
+        genome_1, genome_2 = genomes[id(selection[i])], genomes[id(selection[i+1])]
+        start = random.randrange(max(1, len(genome_1[0])))
+        offspring.extend(_cx_children(genome_1, genome_2, keys, jobs, position, start))
+    return offspring
@@ -1,7 +1,12 @@
 import random
+import multiprocessing
+from collections import deque
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from auxiliary_functions import *
+from Instance_functions import WORKCENTER_FLOW
 
-def allocation(list_jobs, due_dates, processing_times, eligibility, machines):
+def allocation(list_jobs, due_dates, processing_times, eligibility, machines, instance=None, rng=None, candidates=None):
     """
     Allocates jobs to machines following:
     1. Sorting by Earliest Due Date (EDD)
@@ -14,12 +19,17 @@ def allocation(list_jobs, due_dates, processing_times, eligibility, machines):
         processing_times: Dictionary {(job_id, wc, machine): time}
         eligibility: Dictionary {(job_id, machine): 1/0}
         machines: Dictionary {wc: [machines]}
+        instance: Optional ProblemInstance, replaces the eligibility and processing time lookups
+        rng: Optional random.Random for the tie-breaks (default: the global random module)
+        candidates: Optional table from allocation_table (computed here when not given)
 
     Returns:
         {(workcenter, machine): [job_sequence]}
     """
     # 1. Initialization with new format
     schedule = {}
+    if rng is None:
+        rng = random
 
     # 2. Sort jobs by EDD (converting to integers)
     try:
@@ -28,29 +38,64 @@ def allocation(list_jobs, due_dates, processing_times, eligibility, machines):
     except (ValueError, KeyError) as e:
         raise ValueError(f"Error sorting jobs: {str(e)}")
 
-    # 3. Fixed order of workcenters in production flow
-    workcenter_flow = ['PLASTIC', 'SMT', 'PTH', 'ASSEMBLY']
+    # 3. Candidate machines of each (job, workcenter)
+    if candidates is None:
+        candidates = allocation_table(jobs_sorted, processing_times, eligibility, machines, instance)
 
     # 4. Allocation by flow stage
-    for wc in workcenter_flow:
-        if wc not in machines:
-            continue
-
+    for wc, wc_candidates in candidates.items():
         # Initialize machines for this workcenter
         for machine in machines[wc]:
             schedule[(wc, machine)] = []
 
         for job in jobs_sorted:
-            # 4.1. Eligible machines for this job
+            job_candidates = wc_candidates.get(job)
+            if not job_candidates:
+                continue  # Job cannot be processed at this stage
+
+            # 4.1. Random tie-breaker if needed
+            chosen_machine = rng.choice(job_candidates) if len(job_candidates) > 1 else job_candidates[0]
+
+            # 4.2. Allocate job to chosen machine
+            schedule[(wc, chosen_machine)].append(job)
+
+    return schedule
+
+def allocation_table(list_jobs, processing_times, eligibility, machines, instance=None):
+    """
+    Candidate machines (eligible, with the shortest processing time) of every job in every
+    workcenter. They do not depend on the job order, so a population can compute them once.
+
+    Parameters:
+        list_jobs: List of job IDs
+        processing_times: Dictionary {(job_id, wc, machine): time}
+        eligibility: Dictionary {(job_id, machine): 1/0}
+        machines: Dictionary {wc: [machines]}
+        instance: Optional ProblemInstance, replaces the eligibility and processing time lookups
+
+    Returns:
+        {wc: {job: [candidate machines]}} in production flow order (empty list = not processed)
+    """
+    table = {}
+
+    for wc in WORKCENTER_FLOW:
+        if wc not in machines:
+            continue
+
+        # Array-backed instance: candidates of all jobs computed at once
+        if instance is not None:
+            table[wc] = dict(zip(list_jobs, allocation_candidates(list_jobs, wc, machines[wc], instance)))
+            continue
+
+        table[wc] = {}
+        for job in list_jobs:
+            # Eligible machines for this job
             eligible_machines = [
                 m for m in machines[wc]
                 if eligibility.get((job, m), 0) == 1
             ]
 
-            if not eligible_machines:
-                continue  # Job cannot be processed at this stage
-
-            # 4.2. Find machine with shortest processing time
+            # Find machine with shortest processing time
             min_time = float('inf')
             candidates = []
 
@@ -65,25 +110,50 @@ def allocation(list_jobs, due_dates, processing_times, eligibility, machines):
                 except KeyError:
                     continue
 
-            if not candidates:
-                continue  # No processing time found
+            table[wc][job] = candidates
 
-            # 4.3. Random tie-breaker if needed
-            chosen_machine = random.choice(candidates) if len(candidates) > 1 else candidates[0]
+    return table
 
-            # 4.4. Allocate job to chosen machine
-            schedule[(wc, chosen_machine)].append(job)
+def allocation_candidates(jobs, wc, wc_machines, instance):
+    """
+    Eligible machines with the shortest processing time for each job in a workcenter.
 
-    return schedule
+    Parameters:
+        jobs: List of job IDs
+        wc: Workcenter
+        wc_machines: Machines of the workcenter, in allocation order
+        instance: ProblemInstance
+
+    Returns:
+        List with the candidate machines of each job (empty if the job cannot be processed)
+    """
+    job_indices = [instance.job_index[job] for job in jobs]
+    machine_indices = [instance.machine_index[(wc, machine)] for machine in wc_machines]
+
+    eligible = instance.eligibility[np.ix_(job_indices, machine_indices)]
+    times = np.where(eligible, instance.processing_time[np.ix_(job_indices, machine_indices)], np.inf)
+    is_candidate = eligible & (times == times.min(axis=1, initial=np.inf)[:, None])
 
-def optimize_sequence_with_setup(schedule, dict_setup_matrices, lookahead):
+    return [
+        [machine for machine, flag in zip(wc_machines, row) if flag]
+        for row in is_candidate.tolist()
+    ]
+
+def optimize_sequence_with_setup(schedule, dict_setup_matrices, lookahead, batch_products=False):
     """
     Optimizes production sequence by minimizing setup times between consecutive operations.
 
+    Greedy with a sliding window: after each operation, the next one is the operation with
+    the minimum setup among the next 'lookahead' pending operations (the first one on ties,
+    or the next in order when no setup is defined). The window is refilled from a deque, so
+    each machine is sequenced in O(n × lookahead).
+
     Args:
         schedule: {(workcenter, machine): [op1, op2, ...]}
         dict_setup_matrices: Dictionary of setup matrices by workcenter
         lookahead: Number of operations ahead to consider for reordering
+        batch_products: If True, the operations of the window with the same product class as
+            the chosen one are sequenced right after it (needs the setup_model matrices)
 
     Returns:
         New optimized schedule in format {(workcenter, machine): [operations]}
@@ -92,96 +162,233 @@ def optimize_sequence_with_setup(schedule, dict_setup_matrices, lookahead):
 
     # 1. Process each machine in original schedule
     for (wc, machine), sequence in schedule.items():
-        current_sequence = sequence.copy()
-        optimized_sequence = []
-
-        while current_sequence:
-            if not optimized_sequence:
-                # First operation: take next available
-                current_op = current_sequence.pop(0)
-                optimized_sequence.append(current_op)
-            else:
-                # 2. Get last operation in optimized sequence
-                last_op = optimized_sequence[-1]
-
-                # 3. Analyze next 'lookahead' operations
-                candidates = current_sequence[:lookahead]
-
-                if not candidates:
-                    break
-
-                # 4. Find operation with minimum setup time
-                best_candidate = None
-                best_index = 0
-                min_setup = float('inf')
-
-                for i, candidate in enumerate(candidates):
-                    setup_time = dict_setup_matrices.get(wc, {}).get(
-                        (last_op, candidate, machine),
-                        float('inf')  # Default if not found
-                    )
-
-                    if setup_time < min_setup:
-                        min_setup = setup_time
-                        best_candidate = candidate
-                        best_index = i
-
-                # 5. Add best candidate found
-                if best_candidate is not None:
-                    current_sequence.pop(best_index)
-                    optimized_sequence.append(best_candidate)
-                else:
-                    # If no setup time defined, take next normal one
-                    optimized_sequence.append(current_sequence.pop(0))
-
-        # 6. Store optimized sequence
-        optimized_schedule[(wc, machine)] = optimized_sequence
+        optimized_schedule[(wc, machine)] = sequence_machine(
+            sequence, dict_setup_matrices.get(wc, {}), machine, lookahead, batch_products
+        )
 
     return optimized_schedule
 
-def generate_optimized_population(list_jobs, dict_due_dates, dict_processing_time, eligibility_dict, list_workcenters, dict_machines, dict_setup_matrices, optimization_passes, population_size):
+def sequence_machine(sequence, setup_matrix, machine, lookahead, batch_products=False):
     """
-    Generates a population of optimized schedules
+    Setup-aware sequencing of one machine (see optimize_sequence_with_setup).
 
-    Parameters:
-    - n_iterations: Maximum number of iterations
-    - population_size: Desired population size (None to use n_iterations)
-    - ... (other parameters according to your original implementation)
+    Args:
+        sequence: List of operations in their initial order
+        setup_matrix: Setup matrix of the workcenter (SetupMatrix or {(op_from, op_to, machine): time})
+        machine: Machine being sequenced
+        lookahead: Size of the window of candidate operations
+        batch_products: Group the operations of the same product class found in the window
 
     Returns:
-    - List containing only optimized schedules
+        Optimized list of operations
+    """
+    if not sequence:
+        return []
+
+    # 1. Setup lookup: class rows of the SetupMatrix, or one dictionary lookup per pair
+    rows = setup_matrix.setup_rows(machine) if hasattr(setup_matrix, 'setup_rows') else None
+    if rows is not None:
+        job_class = setup_matrix.job_class
+        key = job_class.get
+        def window_setups(last_key, window_keys):
+            if last_key is None:
+                return [float('inf')] * len(window_keys)
+            row = rows[last_key]
+            return [float('inf') if k is None else row[k] for k in window_keys]
+    else:
+        key = lambda op: op  # every operation is its own class
+        def window_setups(last_op, window_ops):
+            return [setup_matrix.get((last_op, op, machine), float('inf')) for op in window_ops]
+
+    # 2. First operation: take next available
+    pending = deque(sequence)
+    optimized_sequence = [pending.popleft()]
+    last_key = key(optimized_sequence[0])
+
+    window = []
+    window_keys = []
+    while pending and len(window) < lookahead:
+        op = pending.popleft()
+        window.append(op)
+        window_keys.append(key(op))
+
+    while window:
+        # 3. Operation with minimum setup in the window (first one if none is defined)
+        setups = window_setups(last_key, window_keys)
+        best_index = setups.index(min(setups))
+
+        last_key = window_keys.pop(best_index)
+        optimized_sequence.append(window.pop(best_index))
+
+        # 4. Product batching: the rest of the window with the same class goes right after
+        if batch_products and last_key is not None and last_key in window_keys:
+            same = [op for op, k in zip(window, window_keys) if k == last_key]
+            optimized_sequence.extend(same)
+            window = [op for op, k in zip(window, window_keys) if k != last_key]
+            window_keys = [k for k in window_keys if k != last_key]
+
+        # 5. Refill the window
+        while pending and len(window) < lookahead:
+            op = pending.popleft()
+            window.append(op)
+            window_keys.append(key(op))
+
+    return optimized_sequence
+
+# Shared data of the population generation (set in the parent, or once per worker by the pool initializer)
+_population_data = {}
+
+def _initialize_population_worker(population_data):
+    """Stores the data shared by all individuals in a worker process."""
+    _population_data.update(population_data)
+
+def _generate_individual(task):
     """
-    population = []
+    Builds one individual from its own seed (same result in any process).
 
-    # Version with assignment
-    iterations = 0  # Default value
-    if population_size is not None:
-        iterations = population_size  # Or some calculation based on population_size
+    Args:
+        task: (position in the population, seed)
 
-    for i in range(iterations):
-        try:
-            # 1. Generate initial schedule
-            current_jobs = list_jobs
+    Returns:
+        Optimized schedule, or None if the generation failed
+    """
+    i, seed = task
+    data = _population_data
+    try:
+        rng = random.Random(seed)
 
-            # Add random variation after first iteration
-            if i > 0:
-                random.shuffle(current_jobs)
+        # 1. Generate initial schedule (random variation after the first individual,
+        #    on a private copy of the job list)
+        current_jobs = list(data['list_jobs'])
+        if i > 0:
+            rng.shuffle(current_jobs)
 
-            schedule = allocation(current_jobs, dict_due_dates, dict_processing_time,
-                                eligibility_dict, list_workcenters, dict_machines)
+        schedule = allocation(current_jobs, data['dict_due_dates'], None, None, data['dict_machines'],
+                              rng=rng, candidates=data['candidates'])
 
-            # 2. Optimize schedule
-            optimized = optimize_sequence_with_setup(schedule, dict_setup_matrices, optimization_passes)
+        # 2. Optimize schedule
+        return optimize_sequence_with_setup(schedule, data['dict_setup_matrices'], data['optimization_passes'],
+                                            data['batch_products'])
 
-            # 3. Add only optimized schedule to population
-            population.append(optimized)
+    except Exception as e:
+        print(f"Error in iteration {i}: {str(e)}")
+        return None
 
-            # Check if reached desired size
-            if population_size is not None and len(population) >= population_size:
-                break
+class PopulationGenerator:
+    """
+    Builds optimized schedules from one candidates table and, with n_workers > 1, one
+    persistent process pool.
 
-        except Exception as e:
-            print(f"Error in iteration {i}: {str(e)}")
-            continue
+    The allocation table is computed once, and the pool (started on the first parallel
+    request) keeps it in its workers, so a solver can build its initial population and
+    every reactivation without recomputing the table or starting new processes.
+
+    Args:
+        list_jobs: List of jobs (never modified)
+        dict_due_dates: Dictionary {job: due date}
+        dict_processing_time: Processing times (unused with an instance)
+        eligibility_dict: Eligibility (unused with an instance)
+        dict_machines: Dictionary {wc: [machines]}
+        dict_setup_matrices: Setup matrices per workcenter
+        optimization_passes: Lookahead of optimize_sequence_with_setup
+        instance: Optional ProblemInstance used by the allocation
+        n_workers: Number of processes building individuals (1 = this process)
+        batch_products: Product batching mode of optimize_sequence_with_setup
+    """
+
+    def __init__(self, list_jobs, dict_due_dates, dict_processing_time, eligibility_dict, dict_machines,
+                 dict_setup_matrices, optimization_passes, instance=None, n_workers=1, batch_products=False):
+        self.n_workers = n_workers
+        self.executor = None
+
+        # Candidate machines of every (job, workcenter), shared by all individuals
+        self.population_data = {
+            'list_jobs': list(list_jobs),
+            'dict_due_dates': dict_due_dates,
+            'dict_machines': dict_machines,
+            'dict_setup_matrices': dict_setup_matrices,
+            'optimization_passes': optimization_passes,
+            'batch_products': batch_products,
+            'candidates': allocation_table(list_jobs, dict_processing_time, eligibility_dict, dict_machines, instance)
+        }
+
+    def individuals(self, count, seed=None):
+        """
+        Yields 'count' new individuals in population order, each one as soon as it is built.
+
+        Each individual is built from its own seed with a private random.Random, so the
+        individuals only depend on 'seed' (or on the global random state when seed is None),
+        not on the number of workers. Individuals whose generation failed are skipped, and
+        closing the iteration early cancels the ones not started yet.
+        """
+        # 1. One seed per individual
+        seed_rng = random.Random(seed if seed is not None else random.getrandbits(64))
+        tasks = [(i, seed_rng.getrandbits(64)) for i in range(count)]
+
+        # 2. In the pool, as futures
+        if self.n_workers > 1 and count > 1:
+            if self.executor is None:
+                start_methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('fork' if 'fork' in start_methods else None)
+                self.executor = ProcessPoolExecutor(max_workers=self.n_workers, mp_context=context,
+                                                    initializer=_initialize_population_worker,
+                                                    initargs=(self.population_data,))
+
+            futures = [self.executor.submit(_generate_individual, task) for task in tasks]
+            try:
+                for future in futures:
+                    individual = future.result()
+                    if individual is not None:
+                        yield individual
+            finally:
+                for future in futures:
+                    future.cancel()
+            return
+
+        # 3. In this process
+        _initialize_population_worker(self.population_data)
+        try:
+            for task in tasks:
+                individual = _generate_individual(task)
+                if individual is not None:
+                    yield individual
+        finally:
+            _population_data.clear()
+
+    def close(self):
+        """Shuts down the worker processes."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def generate_optimized_population(list_jobs, dict_due_dates, dict_processing_time, eligibility_dict, list_workcenters, dict_machines, dict_setup_matrices, optimization_passes, population_size, instance=None, seed=None, n_workers=1, batch_products=False):
+    """
+    Generates a population of optimized schedules
+
+    Each individual is built from its own seed with a private random.Random, so the
+    population only depends on 'seed' (or on the global random state when seed is None),
+    not on the number of workers. The caller's list_jobs is never modified.
+
+    Parameters:
+    - population_size: Desired population size
+    - optimization_passes: Lookahead of optimize_sequence_with_setup
+    - instance: Optional ProblemInstance used by the allocation
+    - seed: Optional seed of the population
+    - n_workers: Number of processes building individuals (1 = this process)
+    - batch_products: Product batching mode of optimize_sequence_with_setup
+    - ... (other parameters according to your original implementation)
+
+    Returns:
+    - List containing only optimized schedules
+    """
+    iterations = population_size if population_size is not None else 0
 
-    return population
\ No newline at end of file
+    with PopulationGenerator(list_jobs, dict_due_dates, dict_processing_time, eligibility_dict, dict_machines,
+                             dict_setup_matrices, optimization_passes, instance, n_workers, batch_products) as generator:
+        return list(generator.individuals(iterations, seed))
@@ -1,12 +1,309 @@
+import hashlib
+from collections import OrderedDict
+from Instance_functions import *
+
+def schedule_machine(jobs, m, precedence, instance, first=0, last_end=None):
+    """
+    Start and end times of the operations of one machine, from position 'first' onward.
+
+    Args:
+        jobs: Array of job indices in sequence order
+        m: Machine index
+        precedence: Array [n_jobs] of precedence times for the machine's workcenter
+        instance: ProblemInstance with processing and setup arrays
+        first: First position to schedule (earlier positions are kept)
+        last_end: End time of the operation at position first-1 (required if first > 0)
+
+    Returns:
+        tuple: ([start times], [end times]) of positions first..len(jobs)-1
+    """
+    # Lookups for the whole sequence at once
+    processing = instance.processing_time[jobs[first:], m].tolist()
+    setups = instance.setup_times(m, jobs[max(first - 1, 0):-1], jobs[max(first, 1):]).tolist()
+    if first == 0:
+        setups = [0] + setups
+    precedences = precedence[jobs[first:]].tolist()
+
+    machine_starts = []
+    machine_ends = []
+    for i in range(len(processing)):
+        # Completion of previous operation on SAME machine + setup
+        machine_start_time = 0 if first + i == 0 else last_end + setups[i]
+        start_time = max(machine_start_time, precedences[i])
+        last_end = start_time + processing[i]
+        machine_starts.append(start_time)
+        machine_ends.append(last_end)
+
+    return machine_starts, machine_ends
+
+def calculate_machine_end_times(individual, instance, buffer_pth_assembly):
+    """
+    Array version of calculate_completion_time using a ProblemInstance.
+
+    Args:
+        individual: {(wc, machine): [operations]}
+        instance: ProblemInstance with processing and setup arrays
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+
+    Returns:
+        tuple: ({(wc, machine): [start times]}, {(wc, machine): [end times]})
+    """
+    job_index = instance.job_index
+    completion = np.full((len(instance.workcenters), len(instance.jobs)), np.nan)
+    starts = {}
+    ends = {}
+
+    # Workcenters in precedence order
+    for w, wc in enumerate(instance.workcenters):
+        precedence = instance.precedence(completion, wc, buffer_pth_assembly)
+
+        for (wc_machine, machine), ops in individual.items():
+            if wc_machine != wc:
+                continue  # Only process current workcenter
+
+            jobs = np.array([job_index[op] for op in ops], dtype=np.int64)
+            machine_starts, machine_ends = schedule_machine(jobs, instance.machine_index[(wc, machine)], precedence, instance)
+
+            completion[w, jobs] = machine_ends
+            starts[(wc, machine)] = machine_starts
+            ends[(wc, machine)] = machine_ends
+
+    return starts, ends
+
+def weighted_tardiness(state, instance):
+    """
+    Weighted tardiness of the ASSEMBLY operations of an evaluated individual.
+
+    Terms are accumulated in schedule order, as in calculate_fitness_population.
+
+    Args:
+        state: Completion state from calculate_completion_state
+        instance: ProblemInstance
+
+    Returns:
+        Total weighted tardiness
+    """
+    jobs = []
+    end_times = []
+    for key, sequence in state['jobs'].items():
+        if key[0] == 'ASSEMBLY':
+            jobs.extend(sequence)
+            end_times.extend(state['ends'][key])
+
+    if not jobs:
+        return 0
+
+    tardiness = np.maximum(0, np.array(end_times) - instance.due_date[jobs]) * instance.weight[jobs]
+    return float(np.cumsum(tardiness)[-1])
+
+def calculate_completion_state(individual, instance, buffer_pth_assembly):
+    """
+    Evaluates an individual and keeps its per-machine completion state, so that later
+    changes can be re-evaluated with update_completion_state.
+
+    Args:
+        individual: {(wc, machine): [operations]}
+        instance: ProblemInstance
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+
+    Returns:
+        Dictionary with:
+            'jobs': {(wc, machine): tuple of job indices}
+            'ends': {(wc, machine): [end times]}
+            'completion': Array [n_workcenters, n_jobs] of completion times
+            'precedence': Array [n_workcenters, n_jobs] of precedence times
+            'fitness': Weighted tardiness
+    """
+    job_index = instance.job_index
+    completion = np.full((len(instance.workcenters), len(instance.jobs)), np.nan)
+    precedence = np.zeros(completion.shape)
+    state = {'jobs': {}, 'ends': {}, 'completion': completion, 'precedence': precedence}
+
+    for w, wc in enumerate(instance.workcenters):
+        precedence[w] = instance.precedence(completion, wc, buffer_pth_assembly)
+
+        for key, ops in individual.items():
+            if key[0] != wc:
+                continue
+
+            jobs = np.array([job_index[op] for op in ops], dtype=np.int64)
+            _, machine_ends = schedule_machine(jobs, instance.machine_index[key], precedence[w], instance)
+
+            completion[w, jobs] = machine_ends
+            state['jobs'][key] = tuple(jobs.tolist())
+            state['ends'][key] = machine_ends
+
+    state['fitness'] = weighted_tardiness(state, instance)
+
+    return state
+
+def update_completion_state(individual, state, instance, buffer_pth_assembly, changed_machines=None):
+    """
+    Delta re-evaluation of an individual derived from an already evaluated one.
+
+    Only the changed machines are rescheduled, from their first modified position
+    onward. In the following workcenters, a machine is rescheduled only from the first
+    operation whose precedence time actually changed; all other machines reuse the
+    stored end times.
+
+    Args:
+        individual: {(wc, machine): [operations]} to evaluate
+        state: Completion state of the reference individual (not modified)
+        instance: ProblemInstance
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+        changed_machines: Optional collection of (wc, machine) keys that may differ from
+            the reference; if None, all machines are compared with the reference
+
+    Returns:
+        New completion state (same format as calculate_completion_state)
+    """
+    job_index = instance.job_index
+    completion = state['completion'].copy()
+    precedence = state['precedence'].copy()
+    new_state = {'jobs': {}, 'ends': {}, 'completion': completion, 'precedence': precedence}
+
+    for w, wc in enumerate(instance.workcenters):
+        # 1. Jobs whose precedence time changed because of previous workcenters
+        precedence[w] = instance.precedence(completion, wc, buffer_pth_assembly)
+        delayed = precedence[w] != state['precedence'][w]
+        workcenter_changed = False
+
+        for key, ops in individual.items():
+            if key[0] != wc:
+                continue
+
+            old_jobs = state['jobs'].get(key, ())
+            old_ends = state['ends'].get(key, [])
+            if changed_machines is None or key in changed_machines or key not in state['jobs']:
+                jobs = tuple(job_index[op] for op in ops)
+            else:
+                jobs = old_jobs
+
+            # 2. First position that must be rescheduled: first modified operation...
+            first = next((i for i, (new, old) in enumerate(zip(jobs, old_jobs)) if new != old),
+                         min(len(jobs), len(old_jobs)))
+
+            # ... or first operation whose precedence time changed
+            if first > 0 and delayed.any():
+                moved = np.flatnonzero(delayed[list(jobs[:first])])
+                if len(moved):
+                    first = int(moved[0])
+
+            if first == len(jobs) == len(old_jobs):
+                # Machine unchanged: reuse the stored end times
+                new_state['jobs'][key] = old_jobs
+                new_state['ends'][key] = old_ends
+                continue
+
+            # 3. Reschedule from the first affected position
+            last_end = old_ends[first - 1] if first > 0 else None
+            _, machine_ends = schedule_machine(np.array(jobs, dtype=np.int64), instance.machine_index[key],
+                                               precedence[w], instance, first=first, last_end=last_end)
+
+            new_state['jobs'][key] = jobs
+            new_state['ends'][key] = old_ends[:first] + machine_ends
+            workcenter_changed = True
+
+        # 4. Rebuild the completion times of this workcenter if any machine changed
+        if workcenter_changed:
+            completion[w] = np.nan
+            for key, jobs in new_state['jobs'].items():
+                if key[0] == wc:
+                    completion[w, list(jobs)] = new_state['ends'][key]
+
+    new_state['fitness'] = weighted_tardiness(new_state, instance)
+
+    return new_state
+
+def calculate_fitness_batch(sequences, instance, buffer_pth_assembly):
+    """
+    Weighted tardiness of a whole population, vectorized across individuals.
+
+    Each workcenter is processed position by position: the k-th operation of every
+    machine of every individual is scheduled in a single NumPy step. Operations are
+    computed in the same order and with the same arithmetic as calculate_completion_time,
+    so the results are identical to calculate_fitness_population for individuals that
+    hold each job at most once per workcenter (as produced by the genetic operators).
+
+    Args:
+        sequences: Array [n_individuals, n_machines, length] from encode_population
+        instance: ProblemInstance
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+
+    Returns:
+        Array [n_individuals] with the weighted tardiness of each individual
+    """
+    n_individuals = sequences.shape[0]
+    completion = np.full((n_individuals, len(instance.workcenters), len(instance.jobs)), np.nan)
+    fitness = np.zeros(n_individuals)
+
+    # Workcenters in precedence order
+    for w, wc in enumerate(instance.workcenters):
+        machines = instance.workcenter_machines[wc]
+        if len(machines) == 0:
+            continue
+
+        precedence = instance.precedence(completion, wc, buffer_pth_assembly)
+        wc_sequences = sequences[:, machines, :]
+        valid = wc_sequences >= 0
+        jobs = np.where(valid, wc_sequences, 0)
+        end_times = np.zeros(wc_sequences.shape)
+
+        last_end = np.zeros((n_individuals, len(machines)))
+        last_job = jobs[:, :, 0]
+        for k in range(int(valid.sum(axis=2).max(initial=0))):
+            job = jobs[:, :, k]
+
+            # 1. Completion of previous operation on SAME machine + setup
+            if k == 0:
+                machine_start_time = 0
+            else:
+                machine_start_time = last_end + instance.setup_times(machines, last_job, job)
+
+            # 2. Completion of operation in PREVIOUS WORKCENTER
+            precedence_start_time = np.take_along_axis(precedence, job, axis=1)
+
+            start_time = np.maximum(machine_start_time, precedence_start_time)
+            end_time = start_time + instance.processing_time[job, machines]
+
+            # Positions beyond the end of a sequence keep the machine state
+            last_end = np.where(valid[:, :, k], end_time, last_end)
+            last_job = np.where(valid[:, :, k], job, last_job)
+            end_times[:, :, k] = end_time
+
+            rows, columns = np.nonzero(valid[:, :, k])
+            completion[rows, w, job[rows, columns]] = end_time[rows, columns]
+
+        # Weighted tardiness of ASSEMBLY operations, summed in schedule order
+        if wc == 'ASSEMBLY':
+            tardiness = np.maximum(0, end_times - instance.due_date[jobs]) * instance.weight[jobs]
+            tardiness = np.where(valid, tardiness, 0.0).reshape(n_individuals, -1)
+            if tardiness.shape[1]:
+                fitness = np.cumsum(tardiness, axis=1)[:, -1]
+
+    return fitness
+
 def calculate_completion_time(
     population_item, # Receives population[i] = {'individual': { (wc, machine): [operations] }}
     dict_processing_time,
     dict_setup_matrices,
-    buffer_pth_assembly
+    buffer_pth_assembly,
+    instance=None
 ):
     # Extracts the allocation dictionary of the individual
     individual = population_item
 
+    # Array-backed instance: same timelines without the tuple-keyed lookups
+    if instance is not None:
+        starts, ends = calculate_machine_end_times(individual, instance, buffer_pth_assembly)
+        return {
+            key: [
+                {'OP': op, 'start': start, 'end': end}
+                for op, start, end in zip(individual[key], starts.get(key, []), ends.get(key, []))
+            ]
+            for key in individual
+        }
+
     # Initializes timelines for each machine
     timelines = {}
     for (wc, machine), ops in individual.items():
@@ -90,16 +387,112 @@ def calculate_completion_time(
 
     return timelines
 
+class FitnessCache:
+    """
+    Bounded LRU cache of fitness values keyed by a canonical hash of the schedule.
+
+    Each entry stores only a 16-byte digest and a float (roughly 200 bytes with the
+    dictionary overhead), so max_entries directly bounds the memory used.
+
+    Args:
+        max_entries: Maximum number of stored schedules before evicting the least recently used
+
+    Attributes:
+        hits: Number of fitness values found in the cache
+        misses: Number of fitness values that had to be evaluated
+        evictions: Number of entries removed to respect max_entries
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(individual):
+        """Canonical digest of {(wc, machine): [jobs]}, independent of the machine order."""
+        canonical = repr(sorted((key, tuple(jobs)) for key, jobs in individual.items()))
+        return hashlib.blake2b(canonical.encode(), digest_size=16).digest()
+
+    def get(self, key):
+        """Returns the cached fitness (or None) and updates the counters."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, fitness):
+        """Stores a fitness value, evicting the least recently used entries if needed."""
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def statistics(self):
+        """Returns the cache counters as a dictionary."""
+        total = self.hits + self.misses
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_evictions': self.evictions,
+            'cache_hit_rate': self.hits / total if total else 0.0,
+            'cache_entries': len(self.entries)
+        }
+
 def calculate_fitness_population(
     population,
     dict_processing_time,
     dict_setup_matrices,
     dict_due_dates,
     dict_weights,
-    buffer_pth_assembly
+    buffer_pth_assembly,
+    instance=None,
+    cache=None,
+    pool=None
 ):
     all_fitness = []
 
+    # Cached evaluation: only schedules never seen before are evaluated
+    if cache is not None:
+        keys = [cache.key(individual) for individual in population]
+        all_fitness = [cache.get(key) for key in keys]
+
+        # Duplicates inside the population are evaluated only once
+        pending = {}
+        for i, key in enumerate(keys):
+            if all_fitness[i] is None:
+                pending.setdefault(key, i)
+
+        new_fitness = calculate_fitness_population(
+            [population[i] for i in pending.values()],
+            dict_processing_time, dict_setup_matrices, dict_due_dates, dict_weights,
+            buffer_pth_assembly, instance=instance, pool=pool
+        ) if pending else []
+        for key, fitness in zip(pending, new_fitness):
+            cache.put(key, fitness)
+
+        # Misses counted for repeated schedules are in fact hits
+        repeated = sum(1 for fitness in all_fitness if fitness is None) - len(pending)
+        cache.misses -= repeated
+        cache.hits += repeated
+
+        computed = dict(zip(pending, new_fitness))
+        return [computed[key] if fitness is None else fitness for key, fitness in zip(keys, all_fitness)]
+
+    # Parallel evaluation (the pool holds its own copy of the instance)
+    if pool is not None:
+        return pool.evaluate(population)
+
+    # Array-backed instance: whole population evaluated at once
+    if instance is not None:
+        sequences = encode_population(population, instance)
+        return calculate_fitness_batch(sequences, instance, buffer_pth_assembly).tolist()
+
     for individual in population:
         # 1. Calculate completion times for the individual
         timeline = calculate_completion_time(
@@ -0,0 +1,111 @@
+from auxiliary_functions import *
+
+# Days after the schedule date over which the synthetic due dates are spread
+DUE_DATE_HORIZON = 90
+
+# Jobs per product of the synthetic order books (setup classes)
+JOBS_PER_PRODUCT = 20
+
+
+def synthetic_order_book(n_jobs, seed=0, horizon=DUE_DATE_HORIZON, jobs_per_product=JOBS_PER_PRODUCT):
+    """
+    Generates a synthetic order book with the same columns as the ERP export.
+
+    Every job has one row per workcenter of list_workcenters, with the machines and
+    workcenters of Parameters. The same (n_jobs, seed) always gives the same order book.
+
+    Args:
+        n_jobs: Number of jobs
+        seed: Random seed
+        horizon: Due dates are drawn between 1 and horizon days after schedule_date
+        jobs_per_product: Average number of jobs of each product
+
+    Returns:
+        Raw DataFrame accepted by preprocess_raw_data
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    workcenters = np.array(list_workcenters)
+    n_rows = n_jobs * len(workcenters)
+
+    jobs = np.repeat(np.arange(100000, 100000 + n_jobs), len(workcenters))
+    wcs = np.tile(workcenters, n_jobs)
+    products = np.repeat(rng.integers(0, max(n_jobs // jobs_per_product, 1), n_jobs), len(workcenters))
+    due_days = np.repeat(rng.integers(1, horizon, n_jobs), len(workcenters))
+
+    # Eligibility columns: machine lists for ASSEMBLY, constraints elsewhere
+    machine = []
+    constraints = []
+    for wc, draw in zip(wcs, rng.random(n_rows)):
+        machines = dict_machines[wc]
+        if wc == 'ASSEMBLY':
+            machine.append(','.join(machines[:1 + int(draw * 3)]))
+            constraints.append(None)
+        elif draw < 0.4:
+            machine.append(machines[int(draw * 10) % len(machines)])
+            constraints.append('Mandatory')
+        elif draw < 0.8:
+            machine.append(None)
+            constraints.append('Preferential')
+        else:
+            machine.append(None)
+            constraints.append(', '.join(machines[:2]))
+
+    return pd.DataFrame({
+        'Job': jobs,
+        'Workcenter': wcs,
+        'Product': ['P' + str(p) for p in products],
+        'Due Date': pd.to_datetime(schedule_date) + pd.to_timedelta(due_days, unit='D'),
+        'Quantity': rng.integers(100, 5000, n_rows),
+        'Goal': rng.integers(50, 500, n_rows),
+        'Machine': machine,
+        'Constraints': constraints
+    })
+
+def synthetic_problem_data(n_jobs, seed=0):
+    """
+    Preprocessed synthetic instance, built like load_problem_data builds the real one.
+
+    Args:
+        n_jobs: Number of jobs
+        seed: Random seed of the order book
+
+    Returns:
+        tuple: (jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict,
+                priority_weights_dict, dict_setup_matrices, dict_processing_time, dict_eligibility)
+    """
+    processed_df = preprocess_raw_data(synthetic_order_book(n_jobs, seed), schedule_date)
+
+    jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict = extract_gross_data(processed_df)
+    dict_setup_matrices = setup_model(processed_df, list_workcenters, dict_machines, dict_machine_turns, time_for_turn)
+    dict_processing_time = processing_time(list_workcenters, dict_machines, dict_machine_turns, time_for_turn, quantities_dict, production_goals, workcenter_assignments)
+    dict_eligibility = eligibility(processed_df, list_workcenters, dict_machines)
+
+    return (
+        jobs_list,
+        production_goals,
+        quantities_dict,
+        workcenter_assignments,
+        due_dates_dict,
+        priority_weights_dict,
+        dict_setup_matrices,
+        dict_processing_time,
+        dict_eligibility
+    )
+
+def save_order_book(path, n_jobs, seed=0):
+    """
+    Writes a synthetic order book to an Excel file, usable as path_jobs (sheet 1) in the
+    configuration file of Parameters.
+
+    Args:
+        path: Output .xlsx file
+        n_jobs: Number of jobs
+        seed: Random seed
+    """
+    import pandas as pd
+
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        pd.DataFrame({'Synthetic order book': [f'{n_jobs} jobs, seed {seed}']}).to_excel(writer, sheet_name='info', index=False)
+        synthetic_order_book(n_jobs, seed).to_excel(writer, sheet_name='orders', index=False)
@@ -0,0 +1,289 @@
+import numpy as np
+
+# Fixed order of workcenters in production flow
+WORKCENTER_FLOW = ['PLASTIC', 'SMT', 'PTH', 'ASSEMBLY']
+
+
+class ProblemInstance:
+    """
+    Array-backed version of the scheduling instance.
+
+    Jobs, workcenters and machines are mapped to dense integer indices once, so the
+    hot functions (fitness, crossover, allocation) can use NumPy lookups instead of
+    hashing (job, workcenter, machine) tuples on every access.
+
+    Args:
+        jobs_list: List of all job IDs (as returned by extract_gross_data)
+        workcenter_assignments: {workcenter: set(jobs)}
+        due_dates_dict: {job: due_date}
+        priority_weights_dict: {job: weight}
+        dict_processing_time: {(job, workcenter, machine): processing_time}
+        dict_setup_matrices: {workcenter: {(job_from, job_to, machine): setup_time}}
+            or {workcenter: SetupMatrix} (setup_model)
+        dict_eligibility: {(job, machine): 1/0}
+        dict_machines: {workcenter: [machines]}
+
+    Attributes:
+        jobs: List of job IDs (position = job index)
+        job_index: {job: job index}
+        workcenters: Workcenters in production flow order
+        machines: List of (workcenter, machine) (position = machine index)
+        machine_index: {(workcenter, machine): machine index}
+        machine_workcenter: Array [n_machines] with the workcenter index of each machine
+        workcenter_machines: {workcenter: array of machine indices}
+        workcenter_jobs: {workcenter: array of job indices}
+        processing_time: Array [n_jobs, n_machines] (0 where not defined)
+        setup_class: Array [n_machines, n_jobs] with the setup class of each job on each machine
+        setup_table: Array [n_machines, n_classes, n_classes] of setup times (0 where not defined)
+        due_date: Array [n_jobs] (0 where not defined)
+        weight: Array [n_jobs] (1.0 where not defined)
+        eligibility: Boolean array [n_jobs, n_machines]
+        eligible_machines: {job: [machines]} in the order of dict_eligibility
+        eligible_indices: {(job, workcenter): [machine indices]} (see build_eligibility_index)
+        eligible_jobs: {workcenter: set of jobs with an eligible machine in it}
+    """
+
+    def __init__(self, jobs_list, workcenter_assignments, due_dates_dict, priority_weights_dict,
+                 dict_processing_time, dict_setup_matrices, dict_eligibility, dict_machines):
+        # 1. Job indices (jobs only known by their workcenter are appended at the end)
+        self.jobs = list(jobs_list)
+        self.job_index = {job: i for i, job in enumerate(self.jobs)}
+        for wc_jobs in workcenter_assignments.values():
+            for job in wc_jobs:
+                if job not in self.job_index:
+                    self.job_index[job] = len(self.jobs)
+                    self.jobs.append(job)
+
+        # 2. Workcenter and machine indices
+        self.workcenters = list(WORKCENTER_FLOW)
+        self.machines = [
+            (wc, machine)
+            for wc in self.workcenters
+            for machine in dict_machines.get(wc, [])
+        ]
+        self.machine_index = {key: m for m, key in enumerate(self.machines)}
+        self.machine_workcenter = np.array(
+            [self.workcenters.index(wc) for wc, _ in self.machines], dtype=np.int64
+        )
+        self.workcenter_machines = {
+            wc: np.flatnonzero(self.machine_workcenter == w)
+            for w, wc in enumerate(self.workcenters)
+        }
+        self.workcenter_jobs = {
+            wc: np.array(sorted(self.job_index[job] for job in workcenter_assignments.get(wc, [])), dtype=np.int64)
+            for wc in self.workcenters
+        }
+
+        n_jobs = len(self.jobs)
+        n_machines = len(self.machines)
+
+        # 3. Due dates and weights
+        self.due_date = np.zeros(n_jobs)
+        for job, due_date in due_dates_dict.items():
+            self.due_date[self.job_index[job]] = due_date
+
+        self.weight = np.ones(n_jobs)
+        for job, weight in priority_weights_dict.items():
+            self.weight[self.job_index[job]] = weight
+
+        # 4. Processing times
+        self.processing_time = np.zeros((n_jobs, n_machines))
+        for (job, wc, machine), time in dict_processing_time.items():
+            if (wc, machine) in self.machine_index:
+                self.processing_time[self.job_index[job], self.machine_index[(wc, machine)]] = time
+
+        # 5. Setup times as product classes: setup_table[m, class_from, class_to]
+        #    SetupMatrix objects (setup_model) already hold the classes; for plain
+        #    dictionaries (setup_time) each job of the workcenter is its own class
+        workcenter_classes = {}
+        for wc, matrix in dict_setup_matrices.items():
+            if wc not in self.workcenters:
+                continue
+            if hasattr(matrix, 'job_class'):
+                job_class = matrix.job_class
+                tables = {machine: matrix.table[i] for i, machine in enumerate(matrix.machines)}
+            else:
+                job_class = {}
+                for job_from, job_to, _ in matrix:
+                    job_class.setdefault(job_from, len(job_class))
+                    job_class.setdefault(job_to, len(job_class))
+                tables = {}
+                for (job_from, job_to, machine), time in matrix.items():
+                    if machine not in tables:
+                        tables[machine] = np.zeros((len(job_class), len(job_class)))
+                    tables[machine][job_class[job_from], job_class[job_to]] = time
+            workcenter_classes[wc] = (job_class, tables)
+
+        # Last class = jobs without setup data (setup 0)
+        n_classes = max((len(set(job_class.values())) for job_class, _ in workcenter_classes.values()), default=0) + 1
+        self.setup_class = np.full((n_machines, n_jobs), n_classes - 1, dtype=np.int64)
+        self.setup_table = np.zeros((n_machines, n_classes, n_classes))
+        for wc, (job_class, tables) in workcenter_classes.items():
+            jobs = [self.job_index[job] for job in job_class]
+            classes = list(job_class.values())
+            for machine, table in tables.items():
+                if (wc, machine) in self.machine_index:
+                    m = self.machine_index[(wc, machine)]
+                    self.setup_class[m, jobs] = classes
+                    self.setup_table[m, :table.shape[0], :table.shape[1]] = table
+
+        # 6. Eligibility (machine names are unique across workcenters)
+        machine_by_name = {machine: m for m, (_, machine) in enumerate(self.machines)}
+        self.eligibility = np.zeros((n_jobs, n_machines), dtype=bool)
+        self.eligible_machines = {}
+        for (job, machine), eligible in dict_eligibility.items():
+            if eligible == 1:
+                self.eligible_machines.setdefault(job, []).append(machine)
+                if machine in machine_by_name:
+                    self.eligibility[self.job_index[job], machine_by_name[machine]] = True
+
+        # 7. Eligibility index of the crossover repairs
+        self.eligible_indices, self.eligible_jobs = build_eligibility_index(dict_eligibility, self.machines)
+
+    def setup_times(self, machines, jobs_from, jobs_to):
+        """
+        Vectorized setup lookup (indices broadcast together).
+
+        Args:
+            machines: Machine indices
+            jobs_from: Job indices of the previous operations
+            jobs_to: Job indices of the next operations
+
+        Returns:
+            Array of setup times
+        """
+        return self.setup_table[machines, self.setup_class[machines, jobs_from], self.setup_class[machines, jobs_to]]
+
+    def precedence(self, completion, wc, buffer_pth_assembly):
+        """
+        Earliest start of each job in a workcenter given the previous stages.
+
+        Args:
+            completion: Array [..., n_workcenters, n_jobs] with completion times (NaN = not processed)
+            wc: Workcenter being scheduled
+            buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+
+        Returns:
+            Array [..., n_jobs] of precedence times (0 where there is no precedence)
+        """
+        workcenter_position = self.workcenters.index
+
+        # PTH only starts after the maximum time between Plastic and SMT
+        if wc == 'PTH':
+            plastic = completion[..., workcenter_position('PLASTIC'), :]
+            smt = completion[..., workcenter_position('SMT'), :]
+            return np.where(np.isnan(plastic) | np.isnan(smt), 0.0, np.maximum(plastic, smt))
+
+        # Assembly only starts after PTH + buffer
+        if wc == 'ASSEMBLY':
+            pth = completion[..., workcenter_position('PTH'), :]
+            return np.where(np.isnan(pth), 0.0, pth + buffer_pth_assembly)
+
+        # SMT and PLASTIC run in parallel without precedence
+        return np.zeros_like(completion[..., 0, :])
+
+
+def build_eligibility_index(dict_eligibility, machines):
+    """
+    Index of the eligible machines of every job in every workcenter.
+
+    Built once per instance (ProblemInstance) and shared by all crossover calls, instead
+    of filtering the eligible machines of each job by workcenter inside every repair.
+
+    Args:
+        dict_eligibility: {(job, machine): 1/0}
+        machines: List of (workcenter, machine) keys (machine names are unique)
+
+    Returns:
+        tuple: ({(job, workcenter): [indices in machines]} in the order of dict_eligibility,
+                {workcenter: set of jobs with at least one eligible machine})
+    """
+    machine_by_name = {machine: m for m, (_, machine) in enumerate(machines)}
+
+    eligible_indices = {}
+    eligible_jobs = {}
+    for (job, machine), eligible in dict_eligibility.items():
+        if eligible == 1 and machine in machine_by_name:
+            m = machine_by_name[machine]
+            wc = machines[m][0]
+            eligible_indices.setdefault((job, wc), []).append(m)
+            eligible_jobs.setdefault(wc, set()).add(job)
+
+    return eligible_indices, eligible_jobs
+
+def encode_individual(individual, instance):
+    """
+    Converts an individual to integer job indices.
+
+    Args:
+        individual: {(wc, machine): [jobs]}
+        instance: ProblemInstance
+
+    Returns:
+        {(wc, machine): array of job indices}, keeping the individual's machine order
+    """
+    job_index = instance.job_index
+    return {
+        key: np.array([job_index[job] for job in jobs], dtype=np.int64)
+        for key, jobs in individual.items()
+    }
+
+
+def decode_individual(encoded, instance):
+    """
+    Converts an encoded individual back to job IDs.
+
+    Args:
+        encoded: {(wc, machine): array of job indices}
+        instance: ProblemInstance
+
+    Returns:
+        {(wc, machine): [jobs]}
+    """
+    jobs = instance.jobs
+    return {key: [jobs[j] for j in sequence] for key, sequence in encoded.items()}
+
+
+def encode_population(population, instance):
+    """
+    Converts a population to a single padded array of job indices.
+
+    Machines follow the instance order (production flow, then dict_machines order),
+    which is the order used by allocation and kept by the genetic operators.
+
+    Args:
+        population: List of individuals {(wc, machine): [jobs]}
+        instance: ProblemInstance
+
+    Returns:
+        Array [n_individuals, n_machines, max_sequence_length] of job indices (-1 = empty)
+    """
+    job_index = instance.job_index
+    machine_index = instance.machine_index
+
+    max_length = max((len(jobs) for individual in population for jobs in individual.values()), default=0)
+    sequences = np.full((len(population), len(instance.machines), max_length), -1, dtype=np.int64)
+
+    for p, individual in enumerate(population):
+        for key, jobs in individual.items():
+            if jobs:
+                sequences[p, machine_index[key], :len(jobs)] = [job_index[job] for job in jobs]
+
+    return sequences
+
+def decode_population(sequences, instance):
+    """
+    Inverse of encode_population.
+
+    Args:
+        sequences: Array [n_individuals, n_machines, length] of job indices (-1 = empty)
+        instance: ProblemInstance
+
+    Returns:
+        List of individuals {(wc, machine): [jobs]} with every machine of the instance
+    """
+    jobs = instance.jobs
+    return [
+        {key: [jobs[j] for j in row if j >= 0] for key, row in zip(instance.machines, individual)}
+        for individual in np.asarray(sequences).tolist()
+    ]
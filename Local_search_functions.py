@@ -0,0 +1,162 @@
+import random
+import time
+from Fitness_functions import *
+
+# Neighbourhood moves of the local search
+LOCAL_SEARCH_MOVES = ('swap', 'insertion', 'machine')
+
+
+def random_move(individual, instance, rng=None):
+    """
+    Draws a random neighbour of an individual (adjacent swap, insertion, or move of a job
+    to another eligible machine of the same workcenter).
+
+    The individual is not modified: only the changed machine lists are copied.
+
+    Args:
+        individual: {(wc, machine): [jobs]}
+        instance: ProblemInstance (eligibility of the inter-machine moves)
+        rng: Optional random.Random (default: the global random module)
+
+    Returns:
+        tuple: (neighbour, list of changed (wc, machine) keys), or None if no move is possible
+    """
+    if rng is None:
+        rng = random
+
+    sequenced = [key for key, jobs in individual.items() if len(jobs) >= 2]
+    occupied = [key for key, jobs in individual.items() if jobs]
+    if not occupied:
+        return None
+
+    move = rng.choice(LOCAL_SEARCH_MOVES if sequenced else ('machine',))
+    neighbour = dict(individual)
+
+    # 1. Adjacent swap: positions i and i+1 of one machine
+    if move == 'swap':
+        key = rng.choice(sequenced)
+        jobs = list(individual[key])
+        i = rng.randrange(len(jobs) - 1)
+        jobs[i], jobs[i + 1] = jobs[i + 1], jobs[i]
+        neighbour[key] = jobs
+        return neighbour, [key]
+
+    # 2. Insertion: one job removed and inserted at another position of the same machine
+    if move == 'insertion':
+        key = rng.choice(sequenced)
+        jobs = list(individual[key])
+        i, j = rng.sample(range(len(jobs)), 2)
+        jobs.insert(j, jobs.pop(i))
+        neighbour[key] = jobs
+        return neighbour, [key]
+
+    # 3. Inter-machine move: one job to an eligible machine of the same workcenter
+    key = rng.choice(occupied)
+    wc = key[0]
+    i = rng.randrange(len(individual[key]))
+    job = individual[key][i]
+    targets = [
+        other for other in individual
+        if other[0] == wc and other != key
+        and instance.eligibility[instance.job_index[job], instance.machine_index[other]]
+    ]
+    if not targets:
+        return None
+
+    target = rng.choice(targets)
+    source_jobs = list(individual[key])
+    source_jobs.pop(i)
+    target_jobs = list(individual[target])
+    target_jobs.insert(rng.randint(0, len(target_jobs)), job)
+    neighbour[key] = source_jobs
+    neighbour[target] = target_jobs
+    return neighbour, [key, target]
+
+def local_search(individual, instance, buffer_pth_assembly, max_evaluations=100, time_limit=None, rng=None, state=None):
+    """
+    Stochastic first-improvement local search.
+
+    Each candidate move is scored with update_completion_state from the cached machine
+    timelines of the current solution: only the changed machines (from the first moved
+    position) and the operations they delay downstream are rescheduled.
+
+    Args:
+        individual: {(wc, machine): [jobs]}
+        instance: ProblemInstance
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+        max_evaluations: Maximum number of candidate moves evaluated
+        time_limit: Optional limit in seconds
+        rng: Optional random.Random (default: the global random module)
+        state: Optional completion state of the individual (calculate_completion_state)
+
+    Returns:
+        tuple: (best individual found, its completion state)
+    """
+    if state is None:
+        state = calculate_completion_state(individual, instance, buffer_pth_assembly)
+
+    start_time = time.perf_counter()
+    for _ in range(max_evaluations):
+        if time_limit is not None and time.perf_counter() - start_time > time_limit:
+            break
+
+        move = random_move(individual, instance, rng)
+        if move is None:
+            continue
+        neighbour, changed_machines = move
+
+        # Accept the first improving neighbour
+        neighbour_state = update_completion_state(neighbour, state, instance, buffer_pth_assembly, changed_machines)
+        if neighbour_state['fitness'] < state['fitness']:
+            individual, state = neighbour, neighbour_state
+
+    return individual, state
+
+def apply_local_search(population, fitness, n_elite, instance, buffer_pth_assembly, max_evaluations=100,
+                       time_limit=None, rng=None, cache=None):
+    """
+    Memetic step: improves the n_elite best distinct schedules of a population.
+
+    Args:
+        population: List of individuals
+        fitness: List of fitness values of the population
+        n_elite: Number of individuals improved
+        instance: ProblemInstance
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+        max_evaluations: Candidate moves evaluated per individual
+        time_limit: Optional limit in seconds for the whole step
+        rng: Optional random.Random (default: the global random module)
+        cache: Optional FitnessCache that receives the fitness of the improved schedules
+
+    Returns:
+        tuple: (new population, new fitness list); the input lists are not modified
+    """
+    population = list(population)
+    fitness = list(fitness)
+
+    # 1. Best distinct schedules (elitist replacements may repeat individuals)
+    elite = []
+    seen = set()
+    for i in np.argsort(fitness, kind='stable').tolist():
+        if len(elite) >= n_elite:
+            break
+        key = FitnessCache.key(population[i])
+        if key not in seen:
+            seen.add(key)
+            elite.append(i)
+
+    # 2. Local search on each of them, sharing the time budget
+    start_time = time.perf_counter()
+    for i in elite:
+        remaining = None if time_limit is None else time_limit - (time.perf_counter() - start_time)
+        if remaining is not None and remaining <= 0:
+            break
+
+        improved, state = local_search(population[i], instance, buffer_pth_assembly, max_evaluations, remaining, rng)
+        if state['fitness'] < fitness[i]:
+            population[i] = improved
+            fitness[i] = state['fitness']
+            if cache is not None:
+                cache.put(cache.key(improved), state['fitness'])
+
+    return population, fitness
@@ -1,20 +1,22 @@
-import copy
 import random
 
-def mutation(population, mutation_rate):
+def mutation(population, mutation_rate, in_place=False):
     """
     Applies mutation to a population of individuals.
     
     Args:
         population: List of individuals (each individual is a dictionary of machines)
         mutation_rate: Mutation rate (0.0 to 1.0) - percentage of population to be mutated
+        in_place: If True, mutates the given individuals directly (for fresh offspring
+            that nobody else references, ex: the output of the crossover)
         
     Returns:
-        New population with mutated individuals (deep copy of originals)
+        New population list. Without in_place, only the mutated individuals and machine
+        lists are copied (copy-on-write); the other individuals are shared with the input
     """
     
-    # Create deep copy of population to avoid modifying the original
-    pop_mutated = copy.deepcopy(population)
+    # New list; individuals are copied only when they are mutated
+    pop_mutated = list(population)
     
     # Calculate number of individuals to mutate
     n_mutate = max(1, int(mutation_rate * len(pop_mutated)))
@@ -23,7 +25,9 @@ def mutation(population, mutation_rate):
     selected_indices = random.sample(range(len(pop_mutated)), n_mutate)
     
     for idx in selected_indices:
-        ind = pop_mutated[idx]
+        # Copy-on-write of the individual (machine lists are copied below)
+        ind = pop_mutated[idx] if in_place else dict(pop_mutated[idx])
+        pop_mutated[idx] = ind
         
         # Select machines to mutate (at least 1, maximum all)
         n_machines = random.randint(1, len(ind))
@@ -42,6 +46,9 @@ def mutation(population, mutation_rate):
             
             if len(jobs) < 2:
                 continue  # Doesn't make sense to mutate with less than 2 jobs
+
+            if not in_place:
+                jobs = ind[machine] = jobs.copy()
                 
             if mutation_type == 'shuffle':
                 # Shuffles all jobs
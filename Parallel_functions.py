@@ -0,0 +1,85 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from Fitness_functions import *
+
+# Read-only instance data of a worker process, set once by the pool initializer
+_worker_data = {}
+
+def _initialize_worker(instance, buffer_pth_assembly):
+    """Stores the instance data in the worker (inherited directly when the pool uses fork)."""
+    _worker_data['instance'] = instance
+    _worker_data['buffer_pth_assembly'] = buffer_pth_assembly
+
+def _evaluate_chunk(sequences):
+    """Evaluates a chunk of encoded individuals inside a worker."""
+    return calculate_fitness_batch(sequences, _worker_data['instance'], _worker_data['buffer_pth_assembly'])
+
+
+class EvaluationPool:
+    """
+    Persistent process pool for fitness evaluation.
+
+    The ProblemInstance is sent to each worker only once: with the 'fork' start method
+    (default where available) the workers inherit it from the parent memory, otherwise it
+    is pickled once per worker by the pool initializer. Each evaluation then only sends
+    chunks of encoded individuals (small integer arrays) and receives their fitness.
+
+    Args:
+        instance: ProblemInstance
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+        n_workers: Number of worker processes (default: number of CPUs)
+        chunk_size: Individuals per task (default: population split evenly among workers)
+    """
+
+    def __init__(self, instance, buffer_pth_assembly, n_workers=None, chunk_size=None):
+        self.n_workers = n_workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+
+        # Smallest integer type able to hold the job indices (-1 = empty position)
+        self.index_dtype = np.int16 if len(instance.jobs) < np.iinfo(np.int16).max else np.int32
+        self.instance = instance
+
+        start_methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in start_methods else None)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(instance, buffer_pth_assembly)
+        )
+
+    def evaluate(self, population):
+        """
+        Evaluates a population in parallel.
+
+        Args:
+            population: List of individuals {(wc, machine): [jobs]}
+
+        Returns:
+            List with the weighted tardiness of each individual
+        """
+        if not population:
+            return []
+
+        chunk_size = self.chunk_size or math.ceil(len(population) / self.n_workers)
+        chunks = [
+            encode_population(population[i:i + chunk_size], self.instance).astype(self.index_dtype)
+            for i in range(0, len(population), chunk_size)
+        ]
+
+        all_fitness = []
+        for fitness in self.executor.map(_evaluate_chunk, chunks):
+            all_fitness.extend(fitness.tolist())
+
+        return all_fitness
+
+    def close(self):
+        """Shuts down the worker processes."""
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,50 +1,77 @@
-import pandas as pd
-import numpy as np
-import random
-import math
-import time
-from datetime import timedelta
-from copy import deepcopy
-from collections import Counter, defaultdict
-from typing import Dict, List, Tuple
-import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
-from matplotlib.colors import ListedColormap
+import os
+import json
 
 #=== Settings ===#
 
-# path to data
-path_jobs = r'C:.xlsx'
+# Environment variable with the path of a JSON file overriding the defaults below
+CONFIG_VARIABLE = 'HFS_CONFIG'
 
-# problem parameters
-list_workcenters = ['ASSEMBLY','SMT', 'PLASTIC', 'PTH']
-dict_machines = {'ASSEMBLY':['L1','L2','L3','L4','L5','L6','L7','L8'],
-            'PTH':['PTH 1','PTH 2','PTH 3'],
-            'SMT':['SMT 1','SMT 2','SMT 3'],
-            'PLASTIC':['INJ 04','INJ 1','INJ 5',
-                        'INJ 10','INJ 8','INJ 7',
-                        'INJ 6','INJ 3','INJ 2',
-                        'INJ 9','INJ 11']}
+DEFAULT_CONFIG = {
+    # path to data (order book in sheet 'sheet_jobs', read by Cache_functions.load_problem_data)
+    'path_jobs': r'C:.xlsx',
+    'sheet_jobs': 1,
 
-buffer_time = 5 # in days
+    # problem parameters
+    'list_workcenters': ['ASSEMBLY','SMT', 'PLASTIC', 'PTH'],
+    'dict_machines': {'ASSEMBLY':['L1','L2','L3','L4','L5','L6','L7','L8'],
+                'PTH':['PTH 1','PTH 2','PTH 3'],
+                'SMT':['SMT 1','SMT 2','SMT 3'],
+                'PLASTIC':['INJ 04','INJ 1','INJ 5',
+                            'INJ 10','INJ 8','INJ 7',
+                            'INJ 6','INJ 3','INJ 2',
+                            'INJ 9','INJ 11']},
 
-# shifts per machine
-dict_machine_turns = {'L1': 3, 'L2': 3, 'L3': 3, 'L4': 2,'L5':2, 'L6': 2, 'L7': 3, 'L8': 3,
-                      'PTH 1': 3,'PTH 2': 3,'PTH 3': 3,
-                      'SMT 1':3,'SMT 2':3,'SMT 3': 3,
-                      'INJ 04': 3,'INJ 1': 3,'INJ 5': 3,'INJ 10': 3,'INJ 8': 3,'INJ 7': 3,'INJ 6': 3,
-                      'INJ 3': 3,'INJ 2': 3,'INJ 9': 3,'INJ 11': 3}
+    'buffer_time': 5, # in days
 
-# hours per shift
-time_for_turn = 7.5
+    # shifts per machine
+    'dict_machine_turns': {'L1': 3, 'L2': 3, 'L3': 3, 'L4': 2,'L5':2, 'L6': 2, 'L7': 3, 'L8': 3,
+                          'PTH 1': 3,'PTH 2': 3,'PTH 3': 3,
+                          'SMT 1':3,'SMT 2':3,'SMT 3': 3,
+                          'INJ 04': 3,'INJ 1': 3,'INJ 5': 3,'INJ 10': 3,'INJ 8': 3,'INJ 7': 3,'INJ 6': 3,
+                          'INJ 3': 3,'INJ 2': 3,'INJ 9': 3,'INJ 11': 3},
 
-# schedule start date
-schedule_date = pd.to_datetime('2025-03-01')
+    # hours per shift
+    'time_for_turn': 7.5,
 
-# Data import
-raw_data_df = pd.read_excel(path_jobs, sheet_name=1 )
+    # schedule start date (ISO format)
+    'schedule_date': '2025-03-01'
+}
 
-print(raw_data_df)
+def load_config(path=None, **overrides):
+    """
+    Returns the problem settings: the defaults, updated by a JSON file and then by keyword arguments.
+
+    Args:
+        path: Optional JSON file with any of the DEFAULT_CONFIG keys
+        overrides: Settings given directly (ex: load_config(time_for_turn=8))
+
+    Returns:
+        Dictionary with all the DEFAULT_CONFIG keys
+    """
+    config = json.loads(json.dumps(DEFAULT_CONFIG))  # independent copy of the defaults
+
+    if path is not None:
+        with open(path) as file:
+            config.update(json.load(file))
+    config.update(overrides)
+
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown settings {sorted(unknown)}, use one of {list(DEFAULT_CONFIG)}")
+
+    return config
+
+# Settings of this run (only a small JSON file is read, and only when HFS_CONFIG is set)
+problem_config = load_config(os.environ.get(CONFIG_VARIABLE))
+
+path_jobs = problem_config['path_jobs']
+sheet_jobs = problem_config['sheet_jobs']
+list_workcenters = problem_config['list_workcenters']
+dict_machines = problem_config['dict_machines']
+buffer_time = problem_config['buffer_time']
+dict_machine_turns = problem_config['dict_machine_turns']
+time_for_turn = problem_config['time_for_turn']
+schedule_date = problem_config['schedule_date']
 
 def generate_taguchi_matrix():
     # Defining parameters and levels as requested
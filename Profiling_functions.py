@@ -0,0 +1,117 @@
+import time
+
+# Phases of a GA run timed by the solver
+PROFILED_PHASES = ('initialization', 'evaluation', 'selection', 'crossover', 'mutation',
+                   'replacement', 'reactivation', 'local_search')
+
+
+class _NoPhase:
+    """Context of a disabled profiler: does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase:
+    """Context timing one call of a phase."""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class PhaseProfiler:
+    """
+    Wall time and call count of each phase of the GA, per generation.
+
+        with profiler.phase('crossover'):
+            offspring = ox_crossover(...)
+
+    end_generation() returns the columns 'time_<phase>' and 'calls_<phase>' of the
+    generation just finished (merged by solve() into the generation statistics) and
+    starts the next one. A disabled profiler returns a shared empty context and no
+    columns, so leaving the calls in the hot path costs almost nothing.
+
+    Args:
+        enabled: If False, nothing is recorded
+        phases: Phases always present in the columns (others are added when first timed)
+
+    Attributes:
+        totals: Dictionary {phase: [seconds, calls]} over all generations
+    """
+
+    def __init__(self, enabled=True, phases=PROFILED_PHASES):
+        self.enabled = enabled
+        self.phases = list(phases)
+        self.current = {}
+        self.totals = {}
+
+    def phase(self, name):
+        """Context manager timing one call of the phase 'name'."""
+        if not self.enabled:
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def add(self, name, seconds, calls=1):
+        """Adds time measured outside phase() to a phase."""
+        if not self.enabled:
+            return
+        if name not in self.phases:
+            self.phases.append(name)
+
+        for table in (self.current, self.totals):
+            entry = table.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+
+    def end_generation(self):
+        """
+        Closes the current generation.
+
+        Returns:
+            Dictionary {'time_<phase>': seconds, 'calls_<phase>': count} (empty when disabled)
+        """
+        if not self.enabled:
+            return {}
+
+        columns = {}
+        for name in self.phases:
+            seconds, calls = self.current.get(name, (0.0, 0))
+            columns[f'time_{name}'] = seconds
+            columns[f'calls_{name}'] = calls
+        self.current = {}
+        return columns
+
+    def summary(self):
+        """
+        Totals of the run per phase.
+
+        Returns:
+            DataFrame with columns phase, time, calls and share (fraction of the profiled time)
+        """
+        import pandas as pd
+
+        total_time = sum(seconds for seconds, _ in self.totals.values()) or 1.0
+        return pd.DataFrame(
+            [(name, seconds, calls, seconds / total_time) for name, (seconds, calls) in self.totals.items()],
+            columns=['phase', 'time', 'calls', 'share']
+        ).sort_values('time', ascending=False, ignore_index=True)
+
+
+# Shared disabled profiler, default of the functions taking a profiler
+NO_PROFILER = PhaseProfiler(enabled=False)
@@ -1,14 +1,15 @@
-from EDD_functions import *
+import numpy as np
 
-def reactivate_population(population, fitness, reactivation_percentage):
+def reactivate_population(population, fitness, reactivation_percentage, generate_individuals):
     """
     Replaces part of the population with new random individuals.
-    
+
     Args:
         population: current list of individuals
         fitness: list of fitness values
         reactivation_percentage: fraction of population to be reactivated
-        
+        generate_individuals: function that returns a list of 'count' new individuals
+
     Returns:
         new_population: population with best individuals preserved and new random individuals added
     """
@@ -23,9 +24,9 @@ def reactivate_population(population, fitness, reactivation_percentage):
 
     # Generate new individuals to replenish the population
     new_count = pop_size - keep_count
-    new_individuals = generate_optimized_population(selected_orders, due_dates_dict, dict_processing_time, dict_eligibility, list_workcenters, dict_machines, dict_setup_matrices, 5, 100)
+    new_individuals = generate_individuals(new_count)
 
     # Combine the best with the new individuals
     new_population = best_individuals + new_individuals
 
-    return new_population
\ No newline at end of file
+    return new_population
@@ -1,7 +1,6 @@
 import random
 import math
 
-#@timeit
 def simple_replacement(original_population, offspring, original_fitness, offspring_fitness):
     """
     Simple replacement that:
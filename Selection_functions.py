@@ -73,44 +73,49 @@ def rank_selection(individuals, k, evolutionary_pressure, population_fitness):
 
     return selected
 
-def tournament_selection(individuals, k, tournament_size, fitness_values, maximization=False):
+def tournament_selection(individuals, k, tournament_size, fitness_values, maximization=False, return_indices=False):
     """
     Tournament Selection:
-    1. For each selection, randomly chooses 'tournament_size' individuals
+    1. For each selection, randomly chooses 'tournament_size' indices
     2. Selects the best (or worst) of these individuals according to the criterion
 
+    Competitors are handled by index, so each tournament costs O(tournament_size)
+    without comparing individuals.
+
     Args:
         individuals: List of individuals (any format)
         k: Number of individuals to select
         tournament_size: Number of competitors in each tournament (default=3)
         fitness_values: Optional list with corresponding fitness values
         maximization: True for maximization (selects the best), False for minimization
+        return_indices: True to return the indices of the winners instead of the individuals
 
     Returns:
-        List with selected individuals
+        List with selected individuals (or their indices if return_indices)
     """
     # Check if tournament size is valid
     tournament_size = min(tournament_size, len(individuals))
 
+    # Fitness by index
+    if fitness_values is None:
+        # Assume individuals have fitness.values attribute (like in DEAP)
+        fitness_values = [ind.fitness.values[0] for ind in individuals]
+
+    choose = max if maximization else min
+    population_indices = range(len(individuals))
+
     selected = []
 
     for _ in range(k):
         # Select random competitors
-        competitors = random.sample(individuals, tournament_size)
-
-        # Determine winner based on fitness
-        if fitness_values is not None:
-            # Use the provided fitness_values list
-            competitors_fitness = [fitness_values[individuals.index(ind)] for ind in competitors]
-            best_idx = competitors_fitness.index(max(competitors_fitness)) if maximization else competitors_fitness.index(min(competitors_fitness))
-            winner = competitors[best_idx]
-        else:
-            # Assume individuals have fitness.values attribute (like in DEAP)
-            if maximization:
-                winner = max(competitors, key=lambda ind: ind.fitness.values[0])
-            else:
-                winner = min(competitors, key=lambda ind: ind.fitness.values[0])
+        competitors = random.sample(population_indices, tournament_size)
+
+        # Determine winner based on fitness (first competitor wins ties)
+        winner = choose(competitors, key=fitness_values.__getitem__)
 
         selected.append(winner)
 
-    return selected
\ No newline at end of file
+    if return_indices:
+        return selected
+
+    return [individuals[i] for i in selected]
@@ -0,0 +1,394 @@
+import os
+import time
+import random
+import numpy as np
+from copy import deepcopy
+from contextlib import closing
+from EDD_functions import *
+from Fitness_functions import *
+from Selection_functions import *
+from Crossover_functions import *
+from Mutation_function import *
+from Replacement_functions import *
+from Reactivation_function import *
+from Local_search_functions import *
+from Statistics_functions import *
+from Checkpoint_functions import *
+from Profiling_functions import *
+
+# GA settings used for the keys a configuration does not define
+DEFAULT_SOLVER_CONFIG = {
+    'restart': True,
+    'popsize': 100,
+    'selection': 'tournament',
+    'crossover': 'OX',
+    'pmut': 0.02,
+    'replacement': 'hill_climbing',
+    'MaxGen': 500,
+    'tournament_size': 7,
+    'selection_pressure': 1.8,
+    'stagnation_limit': 10,
+    'reactivation_percentage': 0.5,
+    'elitism': 10,
+    'local_search': 0,  # moves per individual of the memetic step (0 = no local search)
+    'local_search_elite': 5,
+    'optimization_passes': 5,  # lookahead of the EDD individuals
+    'evaluation_chunk': None  # individuals evaluated between two stop checks (None = whole batches)
+}
+
+# Individuals built between two checks of the budget and the cancellation
+INITIALIZATION_CHUNK = 10
+
+# Reasons returned in result['stop_reason']
+STOP_REASONS = ('generations', 'time_budget', 'target_fitness', 'cancelled')
+
+
+class SearchStopped(Exception):
+    """Raised inside a generation when the budget is exhausted or the search is cancelled."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def evolve_population(population, population_fitness, config, jobs, temperature, evaluate, instance,
+                      buffer_pth_assembly, cache=None, time_limit=None, profiler=NO_PROFILER):
+    """
+    One generation of the genetic algorithm after the evaluation of the population:
+    selection, crossover, mutation, replacement and the optional local search.
+
+    Args:
+        population: List of individuals
+        population_fitness: Fitness of each individual
+        config: Complete solver configuration (see DEFAULT_SOLVER_CONFIG)
+        jobs: List of jobs to schedule
+        temperature: Current temperature of the SA replacement
+        evaluate: Function returning the fitness list of a list of individuals
+        instance: ProblemInstance
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+        cache: Optional FitnessCache that receives the schedules improved by the local search
+        time_limit: Optional limit in seconds of the local search
+        profiler: Optional PhaseProfiler timing selection, crossover, mutation, replacement
+            and local search (the evaluation is timed inside 'evaluate')
+
+    Returns:
+        tuple: (new population, new temperature, fitness of the selected parents, fitness of the offspring)
+    """
+    # Selection
+    with profiler.phase('selection'):
+        if config['selection'] == 'tournament':
+            selected_indices = tournament_selection(population, len(population), config['tournament_size'], population_fitness, return_indices=True)
+            selected_parents = [population[i] for i in selected_indices]
+        elif config['selection'] == 'roulette':
+            selected_parents = roulette_selection(population, len(population), population_fitness)
+        else:
+            selected_parents = rank_selection(population, len(population), config['selection_pressure'], population_fitness)
+
+    fitness_selected = evaluate(selected_parents)
+
+    # Crossover
+    with profiler.phase('crossover'):
+        if config['crossover'] == 'OX':
+            offspring = ox_crossover(selected_parents, None, jobs, len(population), instance=instance)
+        elif config['crossover'] == 'PMX':
+            offspring = pmx_crossover_population(selected_parents, None, jobs, instance=instance)
+        elif config['crossover'] == 'CX':
+            offspring = cx_crossover_population(selected_parents, jobs, instance=instance)
+        else:
+            raise ValueError(f"Unknown crossover '{config['crossover']}', use 'OX', 'PMX' or 'CX'")
+
+    # Mutation (offspring are fresh copies made by the crossover)
+    with profiler.phase('mutation'):
+        offspring = mutation(offspring, config['pmut'], in_place=True)
+
+    # Offspring evaluation
+    fitness_offspring = evaluate(offspring)
+
+    # Replacement
+    with profiler.phase('replacement'):
+        if config['replacement'] == 'simple':
+            population = simple_replacement(population, offspring, population_fitness, fitness_offspring)
+        elif config['replacement'] == 'SA':
+            population = simulated_annealing_substitution(population, offspring, population_fitness, fitness_offspring, temperature, config['elitism'])
+            temperature = min(temperature * 0.95, 1)
+        else:
+            population = hill_climbing_substitution(population, offspring, population_fitness, fitness_offspring, config['elitism'])
+
+    # Local search on the elite (memetic step)
+    if config['local_search'] > 0:
+        replaced_fitness = evaluate(population)
+        with profiler.phase('local_search'):
+            population, _ = apply_local_search(population, replaced_fitness, config['local_search_elite'], instance,
+                                               buffer_pth_assembly, config['local_search'], time_limit, cache=cache)
+
+    return population, temperature, fitness_selected, fitness_offspring
+
+def solve(jobs, instance, dict_due_dates, dict_machines, dict_setup_matrices, buffer_pth_assembly, config=None,
+          time_budget=None, target_fitness=None, on_improvement=None, cancel_event=None, seed=None,
+          statistics=None, checkpoint_path=None, checkpoint_interval=10, pool=None, n_workers=1,
+          fitness_cache_size=100000, profiler=None, on_generation=None, label=1, verbose=True):
+    """
+    Anytime genetic algorithm: runs until MaxGen, the time budget, the target fitness or a
+    cancellation, and always returns the best schedule found so far.
+
+    The budget and the cancellation are checked between evaluation batches (parents,
+    offspring, ...) and every INITIALIZATION_CHUNK new individuals, so the search stops in
+    the middle of a generation instead of at its end. The 'evaluation_chunk' setting splits
+    the batches for finer stops, rounded up to a multiple of the pool workers. The best
+    schedule is tracked over every evaluated individual, offspring included; the first
+    batch is always evaluated, so a schedule is returned even with a budget shorter than
+    one generation.
+
+    Args:
+        jobs: List of jobs to schedule
+        instance: ProblemInstance
+        dict_due_dates: Dictionary {job: due date} (EDD order of the new individuals)
+        dict_machines: Dictionary {wc: [machines]}
+        dict_setup_matrices: Setup matrices per workcenter
+        buffer_pth_assembly: Buffer between PTH and ASSEMBLY
+        config: GA configuration; missing keys are taken from DEFAULT_SOLVER_CONFIG
+        time_budget: Optional wall-clock budget in seconds of this call
+        target_fitness: Optional fitness at which the search stops (lower is better)
+        on_improvement: Optional function(individual, fitness, generation, elapsed) called
+            every time a better schedule is found
+        cancel_event: Optional object with is_set() (threading.Event, multiprocessing.Event)
+            that stops the search when set
+        seed: Optional random seed, for reproducible runs
+        statistics: Optional StatisticsSink receiving one record per generation
+            (default: a new in-memory sink)
+        checkpoint_path: Optional checkpoint file, saved every checkpoint_interval generations;
+            if it exists, the run resumes from it. It is removed when the run reaches MaxGen or
+            the target fitness, and kept when the budget or a cancellation stopped it
+        checkpoint_interval: Generations between checkpoints
+        pool: Optional EvaluationPool for the fitness evaluations
+        n_workers: Number of processes building new individuals
+        fitness_cache_size: Entries of the FitnessCache of the run
+        profiler: Optional PhaseProfiler; its per-phase time and call columns are added to
+            the generation statistics
+        on_generation: Optional function(generation, population, evaluate) called after the
+            evolution of every generation; the population it returns continues the search
+            (migrations of the island model)
+        label: Name of the run in the progress messages
+        verbose: If True, prints one line per generation
+
+    Returns:
+        Dictionary with 'best_individual', 'best_fitness', 'generations' (completed),
+        'elapsed', 'stop_reason' (one of STOP_REASONS), 'ARP', 'statistics' (the sink)
+        and 'cache_statistics'
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+    settings = dict(DEFAULT_SOLVER_CONFIG, **(config or {}))
+    call_start = time.time()
+    deadline = None if time_budget is None else call_start + time_budget
+
+    # Initialization of metrics
+    temperature = 100
+    best_fitness = float('inf')
+    first_fitness_better = None
+    generations_without_improvement = 0
+    start_time = call_start
+    elapsed = 0
+    ARP = None
+    generation = 0
+    stop_reason = 'generations'
+
+    # Best schedule over all evaluations: [individual, fitness]
+    incumbent = [None, float('inf')]
+
+    if statistics is None:
+        statistics = StatisticsSink()
+    if profiler is None:
+        profiler = NO_PROFILER
+
+    # Fitness of schedules already evaluated in this run
+    fitness_cache = FitnessCache(fitness_cache_size)
+
+    def check_stop():
+        """Raises SearchStopped when the run has to end (never before the first schedule)."""
+        if incumbent[0] is None:
+            return
+        if cancel_event is not None and cancel_event.is_set():
+            raise SearchStopped('cancelled')
+        if deadline is not None and time.time() >= deadline:
+            raise SearchStopped('time_budget')
+        if target_fitness is not None and incumbent[1] <= target_fitness:
+            raise SearchStopped('target_fitness')
+
+    # Individuals per evaluation call: whole batches, or evaluation_chunk split evenly among the pool workers
+    evaluation_chunk = settings['evaluation_chunk']
+    if evaluation_chunk and pool is not None:
+        evaluation_chunk = -(-evaluation_chunk // pool.n_workers) * pool.n_workers
+
+    def evaluate(population):
+        """Fitness of a list of individuals, evaluated in chunks between stop checks."""
+        fitness = []
+        step = evaluation_chunk or max(len(population), 1)
+        for first in range(0, len(population), step):
+            check_stop()
+            chunk = population[first:first + step]
+            with profiler.phase('evaluation'):
+                chunk_fitness = calculate_fitness_population(
+                    chunk, None, dict_setup_matrices, dict_due_dates, None, buffer_pth_assembly,
+                    instance=instance, cache=fitness_cache, pool=pool
+                )
+            fitness.extend(chunk_fitness)
+
+            best = int(np.argmin(chunk_fitness))
+            if chunk_fitness[best] < incumbent[1]:
+                incumbent[0] = deepcopy(chunk[best])
+                incumbent[1] = chunk_fitness[best]
+                if on_improvement is not None:
+                    on_improvement(incumbent[0], incumbent[1], generation, time.time() - start_time)
+        return fitness
+
+    # Candidates table and worker pool shared by the initialization and every reactivation
+    generator = PopulationGenerator(jobs, dict_due_dates, None, None, dict_machines, dict_setup_matrices,
+                                    settings['optimization_passes'], instance=instance, n_workers=n_workers)
+
+    def generate(count, phase='initialization'):
+        """
+        New individuals, with a stop check every INITIALIZATION_CHUNK of them (the first one
+        is evaluated if the run has no schedule yet). Only the building time goes to 'phase'.
+        """
+        individuals = []
+        with closing(generator.individuals(count)) as new_individuals:
+            while True:
+                with profiler.phase(phase):
+                    individual = next(new_individuals, None)
+                if individual is None:
+                    break
+
+                individuals.append(individual)
+                if len(individuals) % INITIALIZATION_CHUNK == 0 and len(individuals) < count:
+                    if incumbent[0] is None:
+                        evaluate(individuals[:1])
+                    check_stop()
+        return individuals
+
+    population = []
+    try:
+        # 1. Population initialization, or state of the interrupted run
+        first_generation = 0
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            checkpoint = load_checkpoint(checkpoint_path, instance)
+            if checkpoint['config'] != config:
+                raise ValueError(f"Checkpoint {checkpoint_path} belongs to another configuration: {checkpoint['config']}")
+
+            first_generation = generation = checkpoint['generation']
+            population = checkpoint['population']
+            best_fitness = checkpoint['best_fitness']
+            first_fitness_better = checkpoint['first_fitness_better']
+            generations_without_improvement = checkpoint['generations_without_improvement']
+            temperature = checkpoint['temperature']
+            ARP = checkpoint['ARP']
+            elapsed = checkpoint['elapsed']
+            start_time = time.time() - elapsed
+            incumbent[:] = [checkpoint['best_individual'], checkpoint['incumbent_fitness']]
+            for record in checkpoint['statistics']:
+                statistics.append(record)
+            if verbose:
+                print(f"Resuming test {label} at generation {first_generation + 1}")
+        else:
+            population = generate(settings['popsize'])
+
+        # 2. Evolutionary loop
+        for gen in range(first_generation, settings['MaxGen']):
+            # Evaluation
+            population_fitness = evaluate(population)
+
+            # Update best fitness
+            current_best_idx = np.argmin(population_fitness)
+            current_best = population_fitness[current_best_idx]
+
+            if gen == 0:
+                first_fitness_better = current_best
+
+            if current_best < best_fitness:
+                best_fitness = current_best
+                generations_without_improvement = 0
+            else:
+                generations_without_improvement += 1
+
+            # Reactivation
+            if settings['restart'] and generations_without_improvement >= settings['stagnation_limit']:
+                population = reactivate_population(population, population_fitness, settings['reactivation_percentage'],
+                                                   lambda count: generate(count, 'reactivation'))
+                generations_without_improvement = 0
+
+                # Fitness in the new order (the kept individuals are cache hits)
+                population_fitness = evaluate(population)
+
+            # Selection, crossover, mutation, replacement and local search
+            remaining = None if deadline is None else max(deadline - time.time(), 0)
+            population, temperature, fitness_selected, fitness_offspring = evolve_population(
+                population, population_fitness, settings, jobs, temperature, evaluate, instance,
+                buffer_pth_assembly, fitness_cache, remaining, profiler)
+
+            if on_generation is not None:
+                population = on_generation(gen + 1, population, evaluate)
+
+            # ARP calculation (NaN when the first best fitness is 0, so the column stays numeric)
+            if first_fitness_better == 0:
+                ARP = float('nan')
+            else:
+                ARP = ((first_fitness_better - current_best)/first_fitness_better)*100
+
+            # Time update
+            elapsed = time.time() - start_time
+            generation = gen + 1
+
+            # Add current generation statistics
+            statistics.append({
+                'experiment': str(config),
+                'generation': gen+1,
+                'Population Average': np.average(population_fitness),
+                'Selected Average': np.average(fitness_selected),
+                'Offspring Average': np.average(fitness_offspring),
+                'best_fitness': best_fitness,
+                'execution_time': elapsed,
+                'diversity': np.std(population_fitness),
+                'ARP': ARP,
+                **profiler.end_generation()
+            })
+
+            if verbose:
+                print(f"Generation {gen+1}, test {label}, ARP {ARP}%, best: {best_fitness}, time {elapsed}")
+
+            # Checkpoint of the state at the end of this generation
+            if checkpoint_path is not None and (gen + 1) % checkpoint_interval == 0:
+                save_checkpoint(checkpoint_path, instance, gen + 1, population, incumbent[0], statistics,
+                                config=config, best_fitness=best_fitness, first_fitness_better=first_fitness_better,
+                                generations_without_improvement=generations_without_improvement,
+                                temperature=temperature, ARP=ARP, elapsed=elapsed, incumbent_fitness=incumbent[1])
+
+            check_stop()
+
+        # Schedules improved by the local search of the last generation (cached fitness)
+        if settings['local_search'] > 0 and population:
+            evaluate(population)
+
+    except SearchStopped as stop:
+        stop_reason = stop.reason
+        elapsed = time.time() - start_time
+        if verbose:
+            print(f"Test {label} stopped ({stop_reason}) after {generation} generations")
+    finally:
+        generator.close()
+
+    # Finished runs do not resume
+    if stop_reason in ('generations', 'target_fitness') and checkpoint_path is not None and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    return {
+        'best_individual': incumbent[0],
+        'best_fitness': incumbent[1],
+        'generations': generation,
+        'elapsed': elapsed,
+        'stop_reason': stop_reason,
+        'ARP': ARP,
+        'statistics': statistics,
+        'cache_statistics': fitness_cache.statistics()
+    }
@@ -0,0 +1,134 @@
+import csv
+import json
+import os
+
+# File formats accepted by StatisticsSink (by file extension)
+STATISTICS_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.parquet': 'parquet'}
+
+
+def _json_value(value):
+    """Converts NumPy scalars (and anything else unknown) for json.dumps."""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+class StatisticsSink:
+    """
+    Append-only sink of per-generation statistics.
+
+    Records are buffered and written to a columnar file (CSV, JSON lines or Parquet)
+    every 'flush_every' records, so memory stays bounded and a running experiment can
+    be followed with tail. Without a path, records are only kept in memory.
+
+    Args:
+        path: Output file (format taken from the extension), or None for memory only
+        flush_every: Number of buffered records that triggers a write to disk
+        fields: Optional column order (default: keys of the first record)
+
+    Attributes:
+        count: Number of records appended so far
+    """
+
+    def __init__(self, path=None, flush_every=50, fields=None):
+        self.path = path
+        self.flush_every = flush_every
+        self.fields = list(fields) if fields is not None else None
+        self.buffer = []
+        self.count = 0
+        self._written = 0
+        self._file = None
+        self._writer = None
+
+        if path is not None:
+            extension = os.path.splitext(path)[1].lower()
+            if extension not in STATISTICS_FORMATS:
+                raise ValueError(f"Unknown statistics format '{extension}', use one of {list(STATISTICS_FORMATS)}")
+            self.format = STATISTICS_FORMATS[extension]
+
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        else:
+            self.format = None
+
+    def append(self, record):
+        """Adds one record (dictionary of column: value)."""
+        if self.fields is None:
+            self.fields = list(record.keys())
+
+        self.buffer.append(record)
+        self.count += 1
+
+        if self.path is not None and len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered records to disk."""
+        if self.path is None or not self.buffer:
+            return
+
+        if self.format == 'csv':
+            if self._file is None:
+                self._file = open(self.path, 'w', newline='')
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fields)
+                self._writer.writeheader()
+            self._writer.writerows(self.buffer)
+            self._file.flush()
+
+        elif self.format == 'jsonl':
+            if self._file is None:
+                self._file = open(self.path, 'w')
+            for record in self.buffer:
+                self._file.write(json.dumps(record, default=_json_value) + '\n')
+            self._file.flush()
+
+        else:
+            # Parquet is optional: pyarrow is only needed when this format is used
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pylist(self.buffer)
+            if self._writer is None:
+                # Reopened after to_frame closed the file: the records already written come first
+                previous = pq.read_table(self.path) if self._written else None
+                self._writer = pq.ParquetWriter(self.path, table.schema if previous is None else previous.schema)
+                if previous is not None:
+                    self._writer.write_table(previous)
+            self._writer.write_table(table.select(self._writer.schema.names).cast(self._writer.schema))
+
+        self._written += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        """Flushes the remaining records and closes the file."""
+        self.flush()
+        if self.format == 'parquet' and self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._writer = None
+
+    def to_frame(self):
+        """Returns all the records appended so far as a DataFrame."""
+        import pandas as pd
+
+        if self.path is None:
+            return pd.DataFrame(self.buffer, columns=self.fields)
+
+        self.flush()
+        if self.count == 0:
+            return pd.DataFrame(columns=self.fields)
+        if self.format == 'csv':
+            return pd.read_csv(self.path, float_precision='round_trip')
+        if self.format == 'jsonl':
+            return pd.read_json(self.path, lines=True)
+        if self._writer is not None:
+            # The Parquet footer is only written on close (reopened by the next flush)
+            self.close()
+        return pd.read_parquet(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
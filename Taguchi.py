@@ -5,49 +5,34 @@ from Selection_functions import *
 from Crossover_functions import *
 from Mutation_function import *
 from Replacement_functions import *
+from Instance_functions import *
+from Cache_functions import *
+from Parallel_functions import *
+from Statistics_functions import *
+from Local_search_functions import *
+from Checkpoint_functions import *
+from Solver_functions import *
+from Profiling_functions import *
+import os
+import json
+import time
+import random
+import traceback
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 #=== FUNCTION INVOCATION ===#
 
-processed_df = preprocess_raw_data(raw_data_df, schedule_date)
+# preprocessed instance (the order book is only parsed when it is not in the cache)
+(jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict,
+ dict_setup_matrices, dict_processing_time, dict_eligibility) = load_problem_data()
 
-jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict = extract_gross_data(processed_df)
-
-# generate the processing time dictionary
-dict_setup_matrices = setup_time(processed_df, list_workcenters, dict_machines, dict_machine_turns, time_for_turn)
-
-dict_processing_time = processing_time(list_workcenters, dict_machines, dict_machine_turns, time_for_turn, quantities_dict, production_goals, workcenter_assignments)
-
-dict_eligibility = eligibility(processed_df, list_workcenters, dict_machines)
-
-def reactivate_population(population, fitness, reactivation_percentage, instance):
-    """
-    Replaces part of the population with new random individuals.
-
-    - population: current list of individuals
-    - fitness: list of fitness values
-    - generate_individual: function that generates a new random individual
-    - reactivation_percentage: fraction of population to be reactivated
-    """
-    pop_size = len(population)
-    keep_count = int(pop_size * (1 - reactivation_percentage))
-
-    # Sort population by fitness (lower is better)
-    sorted_indices = np.argsort(fitness)
-
-    # Keep the best individuals
-    best_individuals = [population[i] for i in sorted_indices[:keep_count]]
-
-    # Generate new individuals to replenish the population
-    new_count = pop_size - keep_count
-    new_individuals = generate_optimized_population(instance, due_dates_dict, dict_processing_time,
-                                            dict_eligibility, list_workcenters, dict_machines,
-                                            dict_setup_matrices, 5, pop_size//2)
-
-    # Combine the best with the new ones
-    new_population = best_individuals + new_individuals
-
-    return new_population
+# compile the array-backed instance used by the hot functions
+instance_data = ProblemInstance(jobs_list, workcenter_assignments, due_dates_dict, priority_weights_dict,
+                                dict_processing_time, dict_setup_matrices, dict_eligibility, dict_machines)
 
 #=== Taguchi ===#
 # Generate and visualize the matrix
@@ -64,163 +49,351 @@ for size in INSTANCE_SIZES:
         instance = random.sample(jobs_list.tolist(), size)
         INSTANCES.append(instance)
 
-TOURNAMENT_SIZE = 7
-SELECTION_PRESSURE = 1.8
-STAGNATION_LIMIT = 10
-REACTIVATION_PERCENTAGE = 0.3
-ELITISM = 10
-
-def Taguchi(instance):
-    temperature = 100
-    time_limit = 60*60
-    
-    # DataFrames to store all results
+# Tournament size, elitism, stagnation limit, local search, ... not set by a configuration
+# take the values of DEFAULT_SOLVER_CONFIG (Solver_functions)
+TIME_LIMIT = 60*60  # wall-clock budget of each experiment in seconds
+FITNESS_CACHE_SIZE = 100000
+PROFILE = False  # per-phase time and calls of each generation, added to the generation statistics
+CHECKPOINT_INTERVAL = 10  # generations between checkpoints of campaign cells
+N_WORKERS = 1  # processes for fitness evaluation and population initialization (1 = this process)
+
+# Campaign: one result file per (instance, configuration, seed) cell in RESULTS_DIR, so a
+# restarted run resumes; cells run in parallel when CAMPAIGN_WORKERS > 1
+CAMPAIGN_WORKERS = 1
+SEEDS = [0]
+RESULTS_DIR = 'taguchi_results'
+STATISTICS_FORMAT = 'csv'  # generation statistics file: csv, jsonl or parquet
+
+# Island model: populations in parallel processes exchanging their best individuals
+ISLANDS = 1  # islands per instance (> 1 runs the island model, configurations cycled from EXPERIMENTS)
+MIGRATION_INTERVAL = 10  # generations between migrations
+MIGRANTS = 2  # individuals sent by each island per migration
+MIGRATION_TOPOLOGY = 'ring'  # 'ring' or 'random'
+
+# Persistent evaluation pool, created by the campaign below when N_WORKERS > 1
+evaluation_pool = None
+
+def run_experiment(instance, config, experiment_id=1, seed=None, statistics=None, checkpoint_path=None):
+    """
+    Runs the genetic algorithm once for an instance and a Taguchi configuration.
+
+    Args:
+        instance: List of jobs to schedule
+        config: Dictionary with restart, popsize, selection, crossover, pmut, replacement and MaxGen
+        experiment_id: Label of the configuration in the progress messages
+        seed: Optional random seed, for reproducible runs
+        statistics: Optional StatisticsSink receiving one record per generation
+            (default: a new in-memory sink)
+        checkpoint_path: Optional checkpoint file, saved every CHECKPOINT_INTERVAL generations;
+            if it exists, the run resumes from it (and it is removed when the run finishes)
+
+    Returns:
+        tuple: (DataFrame with the final results, StatisticsSink with the statistics per generation)
+    """
+    profiler = PhaseProfiler(PROFILE)
+    result = solve(instance, instance_data, due_dates_dict, dict_machines, dict_setup_matrices, buffer_time, config,
+                   time_budget=TIME_LIMIT, seed=seed, statistics=statistics, checkpoint_path=checkpoint_path,
+                   checkpoint_interval=CHECKPOINT_INTERVAL, pool=evaluation_pool, n_workers=N_WORKERS,
+                   fitness_cache_size=FITNESS_CACHE_SIZE, profiler=profiler, label=experiment_id)
+
+    if PROFILE:
+        print(profiler.summary().to_string(index=False))
+
+    # At the end of the experiment, add final results
+    cache_statistics = result['cache_statistics']
+    print(f"Fitness cache: {cache_statistics}")
+
+    experiment_results = pd.DataFrame({
+        'experiment': [str(config)],
+        'instance_size': [len(instance)],
+        'best_fitness': [result['best_fitness']],
+        'ARP': [result['ARP']],
+        'Time': [result['elapsed']],
+        **{name: [value] for name, value in cache_statistics.items()}
+    })
+
+    return experiment_results, result['statistics']
+
+def Taguchi(instance, statistics_path=None):
+    # DataFrame to store all results
     final_results = pd.DataFrame(columns=['experiment', 'instance_size', 'best_fitness', 'ARP', 'Time'])
-    complete_statistics = pd.DataFrame()
-    
-    for config in EXPERIMENTS:
-        # Initialization of metrics
-        best_fitness = float('inf')
-        first_fitness_better = None
-        best_individual = None
-        generations_without_improvement = 0
-        start_time = time.time()
-        elapsed = 0
-        
-        # DataFrame for statistics per generation of this experiment
-        experiment_statistics = pd.DataFrame()
-        
-        # 1. Population initialization
-        population = generate_optimized_population(
-            instance, due_dates_dict, dict_processing_time,
-            dict_eligibility, list_workcenters, dict_machines,
-            dict_setup_matrices, 5, config['popsize'])
-
-        # 2. Evolutionary loop
-        for gen in range(config['MaxGen']):
-            if elapsed > time_limit:
-                print("Time limit reached")
-                break
-                
-            # Evaluation
-            population_fitness = calculate_fitness_population(
-                population, dict_processing_time,
-                dict_setup_matrices, due_dates_dict,
-                priority_weights_dict, buffer_time
-            )
 
-            # Update best fitness
-            current_best_idx = np.argmin(population_fitness)
-            current_best = population_fitness[current_best_idx]
-            
-            if gen == 0:
-                first_fitness_better = current_best
-                
-            if current_best < best_fitness:
-                best_fitness = current_best
-                best_individual = deepcopy(population[current_best_idx])
-                generations_without_improvement = 0
-            else:
-                generations_without_improvement += 1
-
-            # Reactivation
-            if config['restart'] and generations_without_improvement >= STAGNATION_LIMIT:
-                population = reactivate_population(population, population_fitness, 0.5, instance)
-                generations_without_improvement = 0
-
-            # Selection
-            if config['selection'] == 'tournament':
-                selected_parents = tournament_selection(population, len(population), TOURNAMENT_SIZE, population_fitness)
-            elif config['selection'] == 'roulette':
-                selected_parents = roulette_selection(population, len(population), population_fitness)
-            else:
-                selected_parents = rank_selection(population, len(population), SELECTION_PRESSURE, population_fitness)
-
-            fitness_selected = calculate_fitness_population(
-                selected_parents, dict_processing_time,
-                dict_setup_matrices, due_dates_dict,
-                priority_weights_dict, buffer_time
-            )
+    # Statistics of all experiments, streamed to statistics_path if given
+    with StatisticsSink(statistics_path) as statistics:
+        for config in EXPERIMENTS:
+            experiment_results, _ = run_experiment(instance, config, EXPERIMENTS.index(config)+1, statistics=statistics)
 
-            # Crossover
-            if config['crossover'] == 'OX':
-                offspring = ox_crossover(selected_parents, dict_eligibility, instance, len(population))
-            else:
-                offspring = []
-                for i in range(0, len(selected_parents)-1, 2):
-                    child1 = pmx_crossover(selected_parents[i], selected_parents[i+1], dict_eligibility, instance)
-                    child2 = pmx_crossover(selected_parents[i], selected_parents[i+1], dict_eligibility, instance)
-                    offspring.extend([child1, child2])
-
-            # Mutation
-            offspring = mutation(offspring, config['pmut'])
-
-            # Offspring evaluation
-            fitness_offspring = calculate_fitness_population(
-                offspring, dict_processing_time,
-                dict_setup_matrices, due_dates_dict,
-                priority_weights_dict, buffer_time
-            )
-            
-            # Replacement
-            if config['replacement'] == 'simple':
-                population = simple_replacement(population, offspring, population_fitness, fitness_offspring)
-            elif config['replacement'] == 'SA':
-                population = simulated_annealing_substitution(population, offspring, population_fitness, fitness_offspring, temperature, ELITISM)
-                temperature = min(temperature * 0.95, 1)
-            else:
-                population = hill_climbing_substitution(population, offspring, population_fitness, fitness_offspring, ELITISM)
-
-            # ARP calculation
-            if first_fitness_better == 0:
-                ARP = "too big"
-            else:
-                ARP = ((first_fitness_better - current_best)/first_fitness_better)*100
-            
-            # Time update
-            elapsed = time.time() - start_time
-            
-            # Add current generation statistics
-            generation_statistics = pd.DataFrame({
-                'experiment': [str(config)],
-                'generation': [gen+1],
-                'Population Average': [np.average(population_fitness)],
-                'Selected Average': [np.average(fitness_selected)],
-                'Offspring Average': [np.average(fitness_offspring)],
-                'best_fitness': [best_fitness],
-                'execution_time': [elapsed],
-                'diversity': [np.std(population_fitness)],
-                'ARP': [ARP]
-            })
-            
-            experiment_statistics = pd.concat([experiment_statistics, generation_statistics], ignore_index=True)
-            
-            print(f"Generation {gen+1}, test {EXPERIMENTS.index(config)+1}, ARP {ARP}%, best: {best_fitness}, time {elapsed}")
-            
-        # At the end of the experiment, add final results
-        experiment_results = pd.DataFrame({
-            'experiment': [str(config)],
-            'instance_size': [len(instance)],
-            'best_fitness': [best_fitness],
-            'ARP': [ARP],
-            'Time': [elapsed]
-        })
-        
-        final_results = pd.concat([final_results, experiment_results], ignore_index=True)
-        complete_statistics = pd.concat([complete_statistics, experiment_statistics], ignore_index=True)
+            final_results = pd.concat([final_results, experiment_results], ignore_index=True)
+
+        complete_statistics = statistics.to_frame()
 
     return final_results, complete_statistics
 
-i = 0
-# For all instances
-complete_results = []
-for instance in INSTANCES:
-    taguchi_results, generational_results = Taguchi(instance)
-    i += 1
-    print(i)
+#=== Campaign ===#
+
+def cell_path(results_dir, instance_id, instance, experiment_id, seed):
+    """Result file of one (instance, configuration, seed) cell."""
+    return os.path.join(results_dir, f"instance{instance_id:03d}_size{len(instance)}_config{experiment_id:02d}_seed{seed}.xlsx")
+
+def run_cell(instance_id, instance, experiment_id, config, seed, path):
+    """
+    Runs one campaign cell and writes its results to its own file.
+
+    The file is written under a temporary name and then renamed, so an interrupted
+    cell never leaves a result file behind and is run again on restart.
+    """
+    # Generations are streamed next to the result file while the cell runs, and a
+    # preempted cell resumes from its last checkpoint
+    statistics_path = os.path.splitext(path)[0] + '_generations.' + STATISTICS_FORMAT
+    checkpoint_path = os.path.splitext(path)[0] + '_checkpoint.npz'
+    with StatisticsSink(statistics_path) as statistics:
+        experiment_results, _ = run_experiment(instance, config, experiment_id, seed, statistics, checkpoint_path)
+        experiment_statistics = statistics.to_frame()
+
+    experiment_results.insert(0, 'instance', instance_id)
+    experiment_results.insert(2, 'seed', seed)
+
+    temporary_path = os.path.join(os.path.dirname(path), '~' + os.path.basename(path))
+    with pd.ExcelWriter(temporary_path, engine='openpyxl') as writer:
+        experiment_results.to_excel(writer, sheet_name='taguchi_results', index=False)
+        experiment_statistics.to_excel(writer, sheet_name='generational_results', index=False)
+    os.replace(temporary_path, path)
+
+    return path
+
+def load_instances(results_dir):
+    """
+    Returns the campaign instances, saved in the results folder on the first run so that a
+    restarted campaign uses exactly the same job lists.
+    """
+    instances_path = os.path.join(results_dir, 'instances.json')
+    if os.path.exists(instances_path):
+        with open(instances_path) as file:
+            return json.load(file)
+
+    with open(instances_path, 'w') as file:
+        json.dump(INSTANCES, file)
+    return INSTANCES
+
+def run_campaign(experiments, seeds, results_dir, n_workers):
+    """
+    Runs every (instance, configuration, seed) cell across a process pool.
+
+    Each finished cell is written to its own file as soon as it completes, and cells
+    whose file already exists are skipped, so a restarted campaign resumes where it stopped.
+
+    Args:
+        experiments: List of Taguchi configurations
+        seeds: List of random seeds
+        results_dir: Folder for the result files
+        n_workers: Number of processes running cells in parallel (1 = this process)
 
-    path = fr".xlsx"
+    Returns:
+        List with the paths of all cell files
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    instances = load_instances(results_dir)
+
+    # All cells of the campaign, skipping the finished ones
+    cells = []
+    paths = []
+    for instance_id, instance in enumerate(instances):
+        for experiment_id, config in enumerate(experiments, start=1):
+            for seed in seeds:
+                path = cell_path(results_dir, instance_id, instance, experiment_id, seed)
+                paths.append(path)
+                if not os.path.exists(path):
+                    cells.append((instance_id, instance, experiment_id, config, seed, path))
+
+    print(f"{len(paths) - len(cells)} of {len(paths)} cells already finished")
+
+    # One worker: the cells run in this process, one after the other
+    if n_workers <= 1:
+        for finished, cell in enumerate(cells, start=1):
+            print(f"Cell {finished}/{len(cells)} written to {run_cell(*cell)}")
+        return paths
+
+    start_methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in start_methods else None)
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as executor:
+        futures = [executor.submit(run_cell, *cell) for cell in cells]
+        for finished, future in enumerate(as_completed(futures), start=1):
+            print(f"Cell {finished}/{len(cells)} written to {future.result()}")
+
+    return paths
+
+def _run_island(connection, config, instance, generations, migration_interval, n_migrants, seed,
+                time_budget=None, inherited_connections=()):
+    """
+    Island process: evolves one population with solve() and exchanges migrants with the driver.
+
+    The island stops, restarts and keeps its best schedule like any solve() run (MaxGen set to
+    'generations', optional time budget). Migrants travel as encoded arrays (encode_population)
+    in ('migrants', array) messages, and the best schedule evaluated is sent back the same way
+    at the end, as ('result', array, fitness). An exception is reported as ('error', traceback),
+    so the driver does not wait for an island that is gone.
+    """
+    # Driver ends of the islands started before this one, inherited by the fork
+    for inherited in inherited_connections:
+        inherited.close()
+
+    try:
+        index_dtype = np.int16 if len(instance_data.jobs) < np.iinfo(np.int16).max else np.int32
+
+        def migrate(generation, population, evaluate):
+            """Sends the best individuals, the immigrants replace the worst ones."""
+            if generation % migration_interval != 0 or generation >= generations:
+                return population
+
+            order = np.argsort(evaluate(population), kind='stable')
+            emigrants = [population[i] for i in order[:n_migrants]]
+            connection.send(('migrants', encode_population(emigrants, instance_data).astype(index_dtype)))
+
+            # None when no other island is still migrating
+            immigrants = connection.recv()
+            if immigrants is not None:
+                for i, individual in zip(order[::-1], decode_population(immigrants, instance_data)):
+                    population[i] = individual
+            return population
+
+        result = solve(instance, instance_data, due_dates_dict, dict_machines, dict_setup_matrices, buffer_time,
+                       dict(config, MaxGen=generations), time_budget=time_budget, seed=seed,
+                       fitness_cache_size=FITNESS_CACHE_SIZE, on_generation=migrate, verbose=False)
+
+        best_individual = encode_population([result['best_individual']], instance_data).astype(index_dtype)
+        connection.send(('result', best_individual, result['best_fitness']))
+    except Exception:
+        connection.send(('error', traceback.format_exc()))
+    finally:
+        connection.close()
+
+def _receive_island(connections, island, expected):
+    """
+    Next message of an island, raising RuntimeError (with the island index) when the
+    island failed or exited without sending it.
+    """
+    try:
+        message = connections[island].recv()
+    except (EOFError, OSError) as error:
+        raise RuntimeError(f"Island {island} exited without sending its {expected}") from error
+
+    if message[0] == 'error':
+        raise RuntimeError(f"Island {island} failed:\n{message[1]}")
+    return message
 
-    with pd.ExcelWriter(path, engine='openpyxl') as writer:
-        taguchi_results.to_excel(writer, sheet_name='taguchi_results', index=False)
-        generational_results.to_excel(writer, sheet_name='generational_results', index=False)
+def run_islands(instance, configs, generations=None, migration_interval=MIGRATION_INTERVAL,
+                n_migrants=MIGRANTS, topology=MIGRATION_TOPOLOGY, seed=None, time_budget=None):
+    """
+    Island model: one population per configuration, each in its own process.
+
+    Every 'migration_interval' generations each island sends its n_migrants best
+    individuals to another island (the next one in a ring, or a random one), where they
+    replace the worst individuals. An island that stops early (time budget) leaves the
+    migrations, which continue between the others.
+
+    Args:
+        instance: List of jobs to schedule
+        configs: One Taguchi configuration per island
+        generations: Generations of every island (default: the largest MaxGen)
+        migration_interval: Generations between migrations
+        n_migrants: Individuals sent by each island per migration
+        topology: 'ring' or 'random'
+        seed: Optional random seed (islands and random topology)
+        time_budget: Optional wall-clock budget in seconds of every island
+
+    Returns:
+        tuple: (best individual, its fitness, list with the best fitness of each island)
+
+    Raises:
+        RuntimeError: If an island fails; the other islands are terminated
+    """
+    if topology not in ('ring', 'random'):
+        raise ValueError(f"Unknown migration topology '{topology}', use 'ring' or 'random'")
+    if generations is None:
+        generations = max(config['MaxGen'] for config in configs)
+
+    n_islands = len(configs)
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(32) for _ in range(n_islands)]
+
+    start_methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in start_methods else None)
+
+    connections = []
+    processes = []
+    finished = False
+    try:
+        for config, island_seed in zip(configs, seeds):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_run_island,
+                args=(child_connection, config, list(instance), generations, migration_interval, n_migrants,
+                      island_seed, time_budget, list(connections))
+            )
+            process.start()
+            child_connection.close()
+            connections.append(parent_connection)
+            processes.append(process)
+
+        # Route the migrants of each migration: every island still running sends its
+        # migrants, or its result once it has stopped
+        results = [None] * n_islands
+        migrating = list(range(n_islands))
+        while migrating:
+            emigrants = {}
+            for i in migrating:
+                message = _receive_island(connections, i, 'migrants or result')
+                if message[0] == 'result':
+                    results[i] = message[1:]
+                else:
+                    emigrants[i] = message[1]
+
+            migrating = list(emigrants)
+            for position, i in enumerate(migrating):
+                if len(migrating) == 1:
+                    source = None
+                elif topology == 'ring':
+                    source = migrating[position - 1]
+                else:
+                    source = rng.choice([j for j in migrating if j != i])
+                connections[i].send(None if source is None else emigrants[source])
+        finished = True
+    finally:
+        # Closed ends unblock the islands waiting for immigrants, failed runs stop the others
+        for connection in connections:
+            connection.close()
+        for process in processes:
+            if not finished and process.is_alive():
+                process.terminate()
+            process.join()
+
+    island_fitness = [fitness for _, fitness in results]
+    best = int(np.argmin(island_fitness))
+    best_individual = decode_population(results[best][0], instance_data)[0]
+
+    return best_individual, island_fitness[best], island_fitness
+
+if __name__ == '__main__':
+    if ISLANDS > 1:
+        # One schedule per instance, all cores working on it through the island model
+        island_configs = [EXPERIMENTS[i % len(EXPERIMENTS)] for i in range(ISLANDS)]
+        island_results = []
+        for instance_id, instance in enumerate(INSTANCES):
+            start_time = time.time()
+            _, best_fitness, island_fitness = run_islands(instance, island_configs, seed=SEEDS[0], time_budget=TIME_LIMIT)
+            print(f"Instance {instance_id}: best {best_fitness}, islands {island_fitness}")
+            island_results.append({'instance': instance_id, 'instance_size': len(instance), 'best_fitness': best_fitness,
+                                   'island_fitness': str(island_fitness), 'Time': time.time() - start_time})
+
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        pd.DataFrame(island_results).to_excel(os.path.join(RESULTS_DIR, 'islands.xlsx'), index=False)
+    else:
+        # Cells run in this process share the evaluation pool; parallel cells evaluate in their own process
+        if N_WORKERS > 1 and CAMPAIGN_WORKERS == 1:
+            evaluation_pool = EvaluationPool(instance_data, buffer_time, N_WORKERS)
+
+        try:
+            run_campaign(EXPERIMENTS, SEEDS, RESULTS_DIR, CAMPAIGN_WORKERS)
+        finally:
+            if evaluation_pool is not None:
+                evaluation_pool.close()
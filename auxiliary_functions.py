@@ -1,4 +1,5 @@
-import pandas as pd
+import numpy as np
+from collections.abc import Mapping
 from Parameters import *
 
 
@@ -13,6 +14,8 @@ def preprocess_raw_data(raw_df, schedule_date):
     Returns:
         Processed DataFrame
     """
+    import pandas as pd
+
     schedule_date_dt = pd.to_datetime(schedule_date)
 
     # Converting the 'numbers' column to string
@@ -35,26 +38,28 @@ def extract_gross_data(processed_df):
     Returns:
         tuple: (jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict)
     """
+    import pandas as pd
+
     # Extraction of basic production data
     jobs_list = pd.array(processed_df['JOB'].unique())
 
-    # Dictionaries for goals and quantities
-    production_goals = {(row['JOB'], row['WORKCENTER']): row['GOAL'] for _, row in processed_df.iterrows()}
-    quantities_dict = {(row['JOB'], row['WORKCENTER']): row['QUANTITY'] for _, row in processed_df.iterrows()}
+    # Dictionaries for goals and quantities (columnar, last row wins for repeated keys)
+    job_workcenter = list(zip(processed_df['JOB'], processed_df['WORKCENTER']))
+    production_goals = dict(zip(job_workcenter, processed_df['GOAL']))
+    quantities_dict = dict(zip(job_workcenter, processed_df['QUANTITY']))
 
-    # Workcenter assignments
-    workcenter_assignments = {}
-    for _, row in processed_df.iterrows():
-        wc = row['WORKCENTER']
-        op = row['JOB']
-        workcenter_assignments.setdefault(wc, set()).add(op)
+    # Workcenter assignments (workcenters in order of first appearance)
+    workcenter_assignments = {
+        wc: set(jobs)
+        for wc, jobs in processed_df.groupby('WORKCENTER', sort=False, dropna=False)['JOB']
+    }
 
     # Extraction of scheduling attributes
-    valid_entries = processed_df[processed_df['DUE DATE'].notna()].copy()
-    due_dates_dict = {row['JOB']: row['DELIVERY TIME'] for _, row in valid_entries.iterrows()}
+    valid_entries = processed_df[processed_df['DUE DATE'].notna()]
+    due_dates_dict = dict(zip(valid_entries['JOB'], valid_entries['DELIVERY TIME']))
 
     priority_weights_dict = (
-        {row['JOB']: row['PRIORITY'] for _, row in valid_entries.iterrows()}
+        dict(zip(valid_entries['JOB'], valid_entries['PRIORITY']))
         if 'PRIORITY' in valid_entries.columns
         else {job: 1.0 for job in due_dates_dict.keys()}
     )
@@ -68,11 +73,33 @@ def extract_gross_data(processed_df):
         priority_weights_dict
     )
 
+# Setup rules by workcenter type (hours)
+SETUP_RULES = {
+    'PTH': {'same': 0.5, 'different': 1.0},    # 30 min (same), 1h (different)
+    'SMT': {'same': 0.5, 'different': 1.0},     # 30 min (same), 1h (different)
+    'PLASTIC': {'same': 0.5, 'different': 2.0}, # 30 min (same), 2h (different)
+    'default': {'same': 0.25, 'different': 1.0}  # 15 min (same), 1h (different)
+}
+
+def setup_rule(wc):
+    """
+    Returns the setup rule of a workcenter (the first rule key contained in its name).
+    """
+    for key in SETUP_RULES:
+        if key in wc:  # Check if WC name contains the key (ex: 'PTH' in 'PTH_LINE1')
+            return SETUP_RULES[key]
+
+    print(f"Info: Using default rule for {wc}")
+    return SETUP_RULES['default']
+
 def setup_time(df_data, workcenters, dict_machines, dict_machine_turns, time_for_turn):
     """
     Generates a setup time dictionary for each (job_from, job_to, machine) combination in days,
     with specific rules for each workcenter type.
 
+    The dictionary has O(jobs² × machines) entries; setup_model answers the same queries
+    with a compact product-class table.
+
     Parameters:
     - df_data: DataFrame with columns JOB, WORKCENTER, PRODUCT
     - workcenters: List of workcenters to consider
@@ -83,27 +110,11 @@ def setup_time(df_data, workcenters, dict_machines, dict_machine_turns, time_for
     Returns:
     - {workcenter: {(job_from, job_to, machine): setup_time_in_days}}
     """
-    # Define setup rules by workcenter type
-    SETUP_RULES = {
-        'PTH': {'same': 0.5, 'different': 1.0},    # 30 min (same), 1h (different)
-        'SMT': {'same': 0.5, 'different': 1.0},     # 30 min (same), 1h (different)
-        'PLASTIC': {'same': 0.5, 'different': 2.0}, # 30 min (same), 2h (different)
-        'default': {'same': 0.25, 'different': 1.0}  # 15 min (same), 1h (different)
-    }
-
     dict_setup_matrices = {}
 
     for wc in workcenters:
         # Determine which setup rule to use
-        setup_rule = None
-        for key in SETUP_RULES:
-            if key in wc:  # Check if WC name contains the key (ex: 'PTH' in 'PTH_LINE1')
-                setup_rule = SETUP_RULES[key]
-                break
-
-        if setup_rule is None:
-            setup_rule = SETUP_RULES['default']
-            print(f"Info: Using default rule for {wc}")
+        rule = setup_rule(wc)
 
         # Initialize setup matrix for this workcenter
         dict_setup_matrices[wc] = {}
@@ -131,7 +142,7 @@ def setup_time(df_data, workcenters, dict_machines, dict_machine_turns, time_for
                     same_product = job_to_product[job_from] == job_to_product[job_to]
 
                     # Apply the correct setup rule
-                    setup_hours = setup_rule['same'] if same_product else setup_rule['different']
+                    setup_hours = rule['same'] if same_product else rule['different']
 
                     # Convert to days considering machine shifts
                     setup_days = setup_hours / (dict_machine_turns.get(machine, 1) * time_for_turn)
@@ -141,6 +152,106 @@ def setup_time(df_data, workcenters, dict_machines, dict_machine_turns, time_for
 
     return dict_setup_matrices
 
+class SetupMatrix(Mapping):
+    """
+    Compact setup matrix of one workcenter.
+
+    Stores a job → product class index and a (machine × class × class) table instead of
+    every (job_from, job_to, machine) triple. It answers the same queries as the
+    dictionaries built by setup_time (get, [], in, iteration).
+
+    Args:
+        job_class: Dictionary {job: class index}
+        machines: List of machines of the workcenter
+        table: Array [n_machines, n_classes, n_classes] of setup times in days
+    """
+
+    def __init__(self, job_class, machines, table):
+        self.job_class = job_class
+        self.machines = list(machines)
+        self.machine_position = {machine: i for i, machine in enumerate(self.machines)}
+        self.table = np.asarray(table, dtype=float)
+        self._rows = self.table.tolist()  # Python floats for scalar lookups
+
+    def get(self, key, default=None):
+        job_from, job_to, machine = key
+        position = self.machine_position.get(machine)
+        class_from = self.job_class.get(job_from)
+        class_to = self.job_class.get(job_to)
+        if position is None or class_from is None or class_to is None:
+            return default
+        return self._rows[position][class_from][class_to]
+
+    def setup_rows(self, machine):
+        """Class × class setup times of a machine as nested lists (None for unknown machines)."""
+        position = self.machine_position.get(machine)
+        return None if position is None else self._rows[position]
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        for job_from in self.job_class:
+            for job_to in self.job_class:
+                for machine in self.machines:
+                    yield (job_from, job_to, machine)
+
+    def __len__(self):
+        return len(self.job_class) ** 2 * len(self.machines)
+
+def setup_model(df_data, workcenters, dict_machines, dict_machine_turns, time_for_turn):
+    """
+    Compact version of setup_time: the setup only depends on whether two jobs share a
+    PRODUCT and on the machine's shifts, so each workcenter stores a job → product class
+    index and a small (machine × class × class) table.
+
+    Parameters:
+    - df_data: DataFrame with columns JOB, WORKCENTER, PRODUCT
+    - workcenters: List of workcenters to consider
+    - dict_machines: Dictionary {workcenter: [machines]}
+    - dict_machine_turns: Dictionary {machine: number of shifts}
+    - time_for_turn: Hours per shift
+
+    Returns:
+    - {workcenter: SetupMatrix}, accepted wherever the setup_time dictionary is used
+    """
+    dict_setup_matrices = {}
+
+    for wc in workcenters:
+        rule = setup_rule(wc)
+        machines = dict_machines.get(wc, [])
+
+        # Filter jobs for current workcenter and remove duplicates
+        wc_data = df_data[df_data['WORKCENTER'] == wc]
+        unique_jobs = wc_data.drop_duplicates('JOB')
+
+        if unique_jobs.empty:
+            print(f"Warning: No jobs found for {wc}")
+
+        # JOB → product class index
+        products = {}
+        job_class = {
+            job: products.setdefault(product, len(products))
+            for job, product in zip(unique_jobs['JOB'], unique_jobs['PRODUCT'])
+        }
+
+        # Same product on the diagonal, different product elsewhere, converted to days
+        same_product = np.eye(len(products), dtype=bool)
+        table = np.empty((len(machines), len(products), len(products)))
+        for i, machine in enumerate(machines):
+            shift_hours = dict_machine_turns.get(machine, 1) * time_for_turn
+            table[i] = np.where(same_product, rule['same'] / shift_hours, rule['different'] / shift_hours)
+
+        dict_setup_matrices[wc] = SetupMatrix(job_class, machines, table)
+
+    return dict_setup_matrices
+
 def processing_time(list_workcenters, dict_machines, dict_machine_turns, time_for_turn, quantity, goal, workcenter_to_ops):
     """
     Function responsible for calculating the processing time of each job, considering goal, shifts and machine
@@ -182,45 +293,51 @@ def eligibility(df_data, workcenters, dict_machines):
         - "Preferential": Job runs on any machine in the workcenter.
         - Other values (ex: machine list): Job only runs on listed machines.
     """
+    import pandas as pd
+
     eligibility_dict = {}
 
     for wc in workcenters:
         machines = dict_machines.get(wc, [])
-        wc_data = df_data[df_data['WORKCENTER'] == wc]
-
-        for _, row in wc_data.iterrows():
-            op = row['JOB']
-            constraints = row.get('CONSTRAINTS', '')
-            machine_info = row['MACHINE']
-
-            # ASSEMBLY workcenter (specific rule)
-            if wc == 'ASSEMBLY':
-                allowed_machines = [m.strip() for m in machine_info.split(',')] if pd.notna(machine_info) else []
-                for machine in machines:
-                    eligibility_dict[(op, machine)] = 1 if machine in allowed_machines else 0
-
-            # Other workcenters
-            else:
-                # Case 1: "Mandatory" constraint
-                if constraints == "Mandatory":
-                    required_machine = machine_info
-                    for machine in machines:
-                        eligibility_dict[(op, machine)] = 1 if machine == required_machine else 0
-
-                # Case 2: "Preferential" constraint → all eligible
-                elif constraints == "Preferential":
-                    for machine in machines:
-                        eligibility_dict[(op, machine)] = 1
-
-                # Case 3: Other values (ex: machine list in CONSTRAINTS)
-                elif pd.notna(constraints) and constraints != "":
-                    allowed_machines = [m.strip() for m in constraints.split(',')]
-                    for machine in machines:
-                        eligibility_dict[(op, machine)] = 1 if machine in allowed_machines else 0
-
-                # Case 4: Empty/null CONSTRAINTS → none eligible (or all, as needed)
-                else:
-                    for machine in machines:
-                        eligibility_dict[(op, machine)] = 0  # Or 1, if default should be "all eligible"
+        wc_data = df_data[df_data['WORKCENTER'] == wc].reset_index(drop=True)
+
+        machine_info = wc_data['MACHINE']
+        constraints = wc_data['CONSTRAINTS'] if 'CONSTRAINTS' in wc_data.columns else pd.Series('', index=wc_data.index)
+
+        # Rows x machines matrix of eligibility flags
+        flags = np.zeros((len(wc_data), len(machines)), dtype=int)
+
+        # ASSEMBLY workcenter (specific rule): machines listed in MACHINE
+        if wc == 'ASSEMBLY':
+            listed_rows = machine_info.notna()
+            listed = machine_info[listed_rows]
+
+        # Other workcenters
+        else:
+            mandatory = constraints == "Mandatory"
+            preferential = constraints == "Preferential"
+
+            # Case 1: "Mandatory" constraint → only the machine in MACHINE
+            for j, machine in enumerate(machines):
+                flags[:, j] |= (mandatory & (machine_info == machine)).to_numpy()
+
+            # Case 2: "Preferential" constraint → all eligible
+            flags[preferential.to_numpy(), :] = 1
+
+            # Case 3: Other values (ex: machine list in CONSTRAINTS)
+            # Case 4: Empty/null CONSTRAINTS → none eligible
+            listed_rows = constraints.notna() & (constraints != "") & ~mandatory & ~preferential
+            listed = constraints[listed_rows]
+
+        # Membership of each machine in the comma separated lists
+        if not listed.empty:
+            allowed = listed.astype(str).str.split(',').explode().str.strip()
+            for j, machine in enumerate(machines):
+                flags[allowed.index[allowed == machine], j] = 1
+
+        # Same insertion order as row by row processing
+        for op, row_flags in zip(wc_data['JOB'], flags.tolist()):
+            for machine, flag in zip(machines, row_flags):
+                eligibility_dict[(op, machine)] = flag
 
     return eligibility_dict
\ No newline at end of file
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import random
+import tracemalloc
+import numpy as np
+import pandas as pd
+from Generator_functions import *
+from Instance_functions import *
+from EDD_functions import *
+from Fitness_functions import *
+from Selection_functions import *
+from Crossover_functions import *
+from Mutation_function import *
+from Solver_functions import *
+
+#=== Settings ===#
+
+# Instance sizes (jobs): the range of Taguchi.INSTANCE_SIZES and larger order books
+BENCHMARK_SIZES = [20, 100, 250, 500, 1000, 2000]
+POPULATION_SIZE = 100
+REPEATS = 3  # timed calls per benchmark, the fastest one is reported
+SEED = 0
+BENCHMARK_PATH = 'benchmark_results.csv'  # results of every run are appended, with their label
+
+
+def measure(function, repeats=REPEATS):
+    """
+    Times a function without arguments.
+
+    Returns:
+        tuple: (result of the last call, fastest wall time in seconds, peak memory in bytes
+                allocated during one extra traced call)
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, min(times), peak
+
+def benchmark_instance(n_jobs, seed=SEED):
+    """
+    Runs every benchmark on one synthetic instance.
+
+    Args:
+        n_jobs: Number of jobs of the instance
+        seed: Random seed of the instance and of the operators
+
+    Returns:
+        List of records (size, benchmark, time, throughput per second, peak memory)
+    """
+    (jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict,
+     dict_setup_matrices, dict_processing_time, dict_eligibility) = synthetic_problem_data(n_jobs, seed)
+    instance = ProblemInstance(jobs_list, workcenter_assignments, due_dates_dict, priority_weights_dict,
+                               dict_processing_time, dict_setup_matrices, dict_eligibility, dict_machines)
+    jobs = jobs_list.tolist()
+    random.seed(seed)
+    np.random.seed(seed)
+
+    def evaluate(population):
+        return calculate_fitness_population(population, None, dict_setup_matrices, due_dates_dict, None,
+                                            buffer_time, instance=instance)
+
+    population = generate_optimized_population(jobs, due_dates_dict, None, None, list_workcenters, dict_machines,
+                                               dict_setup_matrices, 5, POPULATION_SIZE, instance=instance, seed=seed)
+    fitness = evaluate(population)
+    pairs = range(0, len(population) - 1, 2)
+    config = dict(DEFAULT_SOLVER_CONFIG, popsize=POPULATION_SIZE)
+
+    # (name, function, individuals produced or evaluated per call)
+    benchmarks = [
+        ('generate_optimized_population', lambda: generate_optimized_population(
+            jobs, due_dates_dict, None, None, list_workcenters, dict_machines, dict_setup_matrices, 5,
+            POPULATION_SIZE, instance=instance, seed=seed), POPULATION_SIZE),
+        ('calculate_fitness_population', lambda: evaluate(population), len(population)),
+        ('tournament_selection', lambda: tournament_selection(population, len(population), config['tournament_size'], fitness), len(population)),
+        ('roulette_selection', lambda: roulette_selection(population, len(population), fitness), len(population)),
+        ('rank_selection', lambda: rank_selection(population, len(population), config['selection_pressure'], fitness), len(population)),
+        ('ox_crossover', lambda: ox_crossover(population, None, jobs, len(population), instance=instance), len(population)),
+        ('pmx_crossover', lambda: pmx_crossover_population(population, None, jobs, instance=instance), 2 * len(pairs)),
+        ('cx_crossover', lambda: cx_crossover_population(population, jobs, instance=instance), 2 * len(pairs)),
+        ('mutation', lambda: mutation(population, config['pmut']), len(population)),
+        # Evaluations of one generation: selected parents and offspring
+        ('generation', lambda: evolve_population(population, fitness, config, jobs, 100, evaluate, instance, buffer_time), 2 * len(population))
+    ]
+
+    records = []
+    for name, function, items in benchmarks:
+        _, elapsed, peak = measure(function)
+        records.append({
+            'size': n_jobs,
+            'benchmark': name,
+            'time': elapsed,
+            'per_second': items / elapsed if elapsed > 0 else float('inf'),
+            'peak_memory_mb': peak / 2**20
+        })
+        print(f"{n_jobs:>6} jobs  {name:<30} {elapsed * 1000:10.2f} ms  {records[-1]['per_second']:12.1f} /s  "
+              f"{records[-1]['peak_memory_mb']:8.2f} MB")
+
+    return records
+
+
+if __name__ == '__main__':
+    # Optional label of the run (e.g. the commit), to compare runs in BENCHMARK_PATH
+    label = sys.argv[1] if len(sys.argv) > 1 else time.strftime('%Y-%m-%d %H:%M:%S')
+
+    records = []
+    for size in BENCHMARK_SIZES:
+        records.extend(benchmark_instance(size))
+
+    results = pd.DataFrame(records)
+    results.insert(0, 'label', label)
+    results.to_csv(BENCHMARK_PATH, mode='a', header=not os.path.exists(BENCHMARK_PATH), index=False)
+    print(f"Results appended to {BENCHMARK_PATH}")
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+import pandas as pd
+from auxiliary_functions import *
+from Generator_functions import *
+
+#=== Settings ===#
+
+N_JOBS = 12500  # one row per job and workcenter
+SEED = 0
+
+
+#=== Row-by-row reference versions ===#
+
+def extract_gross_data_iterrows(processed_df):
+    """Previous extract_gross_data, kept as reference for the benchmark."""
+    jobs_list = pd.array(processed_df['JOB'].unique())
+    production_goals = {(row['JOB'], row['WORKCENTER']): row['GOAL'] for _, row in processed_df.iterrows()}
+    quantities_dict = {(row['JOB'], row['WORKCENTER']): row['QUANTITY'] for _, row in processed_df.iterrows()}
+
+    workcenter_assignments = {}
+    for _, row in processed_df.iterrows():
+        workcenter_assignments.setdefault(row['WORKCENTER'], set()).add(row['JOB'])
+
+    valid_entries = processed_df[processed_df['DUE DATE'].notna()].copy()
+    due_dates_dict = {row['JOB']: row['DELIVERY TIME'] for _, row in valid_entries.iterrows()}
+    priority_weights_dict = (
+        {row['JOB']: row['PRIORITY'] for _, row in valid_entries.iterrows()}
+        if 'PRIORITY' in valid_entries.columns
+        else {job: 1.0 for job in due_dates_dict.keys()}
+    )
+
+    return jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict
+
+def eligibility_iterrows(df_data, workcenters, dict_machines):
+    """Previous eligibility, kept as reference for the benchmark."""
+    eligibility_dict = {}
+    for wc in workcenters:
+        machines = dict_machines.get(wc, [])
+        wc_data = df_data[df_data['WORKCENTER'] == wc]
+        for _, row in wc_data.iterrows():
+            op = row['JOB']
+            constraints = row.get('CONSTRAINTS', '')
+            machine_info = row['MACHINE']
+            if wc == 'ASSEMBLY':
+                allowed_machines = [m.strip() for m in machine_info.split(',')] if pd.notna(machine_info) else []
+                for machine in machines:
+                    eligibility_dict[(op, machine)] = 1 if machine in allowed_machines else 0
+            elif constraints == "Mandatory":
+                for machine in machines:
+                    eligibility_dict[(op, machine)] = 1 if machine == machine_info else 0
+            elif constraints == "Preferential":
+                for machine in machines:
+                    eligibility_dict[(op, machine)] = 1
+            elif pd.notna(constraints) and constraints != "":
+                allowed_machines = [m.strip() for m in constraints.split(',')]
+                for machine in machines:
+                    eligibility_dict[(op, machine)] = 1 if machine in allowed_machines else 0
+            else:
+                for machine in machines:
+                    eligibility_dict[(op, machine)] = 0
+    return eligibility_dict
+
+
+def timed(function, *args):
+    """Runs a function and returns (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    raw_df = synthetic_order_book(N_JOBS, SEED)
+    processed = preprocess_raw_data(raw_df, schedule_date)
+    print(f"Synthetic order book: {len(processed)} rows, {processed['JOB'].nunique()} jobs")
+
+    reference, time_reference = timed(extract_gross_data_iterrows, processed)
+    columnar, time_columnar = timed(extract_gross_data, processed)
+    assert all(list(a) == list(b) if i == 0 else a == b for i, (a, b) in enumerate(zip(reference, columnar)))
+    print(f"extract_gross_data: iterrows {time_reference:.3f}s, columnar {time_columnar:.3f}s "
+          f"({time_reference / time_columnar:.1f}x)")
+
+    reference, time_reference = timed(eligibility_iterrows, processed, list_workcenters, dict_machines)
+    columnar, time_columnar = timed(eligibility, processed, list_workcenters, dict_machines)
+    assert list(reference.items()) == list(columnar.items())
+    print(f"eligibility: iterrows {time_reference:.3f}s, columnar {time_columnar:.3f}s "
+          f"({time_reference / time_columnar:.1f}x)")
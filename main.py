@@ -1,109 +1,58 @@
 from auxiliary_functions import *
-from EDD_functions import *
-from Fitness_functions import *
-from Selection_functions import *
-from Crossover_functions import *
-from Mutation_function import *
-from Replacement_functions import *
-from Reactivation_function import *
+from Instance_functions import *
+from Cache_functions import *
+from Statistics_functions import *
+from Solver_functions import *
+from Profiling_functions import *
 
 #=== Calling Functions ===#
 
-processed_df = preprocess_raw_data(raw_data_df, schedule_date)
+# preprocessed instance (the order book is only parsed when it is not in the cache)
+(jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict,
+ dict_setup_matrices, dict_processing_time, dict_eligibility) = load_problem_data()
 
-jobs_list, production_goals, quantities_dict, workcenter_assignments, due_dates_dict, priority_weights_dict = extract_gross_data(processed_df)
-
-# generate the setup time dictionary
-dict_setup_matrices = setup_time(processed_df, list_workcenters, dict_machines, dict_machine_turns, time_for_turn)
-
-# generate the processing time dictionary
-dict_processing_time = processing_time(list_workcenters, dict_machines, dict_machine_turns, time_for_turn, quantities_dict, production_goals, workcenter_assignments)
-
-# generate the eligibility dictionary
-dict_eligibility = eligibility(processed_df, list_workcenters, dict_machines)
+# compile the array-backed instance used by the hot functions
+instance_data = ProblemInstance(jobs_list, workcenter_assignments, due_dates_dict, priority_weights_dict,
+                                dict_processing_time, dict_setup_matrices, dict_eligibility, dict_machines)
 
 
 #=== Parameters ===#
-TOURNAMENT_SIZE = 5
-SELECTION_PRESSURE = 1.2
-STAGNATION_LIMIT = 20
-REACTIVATION_PERCENTAGE = 0.3
-GENERATIONS = 100
-
-#=== GENETIC ALGORITHM ===#
-
-# Initialization
-
-population = generate_optimized_population(jobs_list, due_dates_dict, dict_processing_time, dict_eligibility, list_workcenters, dict_machines, dict_setup_matrices, 5, 100)
-
-best_individual = None
-best_fitness = float('inf')
-history = {
-    'best_fitness': [],
-    'avg_fitness': [],
-    'diversity': []
+GA_CONFIG = {
+    'restart': True,
+    'popsize': 100,
+    'selection': 'rank',
+    'crossover': 'OX',
+    'pmut': 0.01,
+    'replacement': 'simple',
+    'MaxGen': 100,
+    'tournament_size': 5,
+    'selection_pressure': 1.8,
+    'stagnation_limit': 20,
+    'reactivation_percentage': 0.5
 }
+TIME_BUDGET = None  # wall-clock budget in seconds of the planning window (None = until MaxGen)
+TARGET_FITNESS = None  # the search stops at this weighted tardiness (None = no target)
+FITNESS_CACHE_SIZE = 100000
+PROFILE = False  # per-phase time and calls of each generation, added to the statistics file
+STATISTICS_PATH = 'ga_statistics.csv'  # per-generation statistics (.csv, .jsonl or .parquet)
+CHECKPOINT_PATH = 'ga_checkpoint.npz'  # run state, the run resumes from it if it exists
+CHECKPOINT_INTERVAL = 10
 
-for gen in range(GENERATIONS):
-    # 1. Evaluate population fitness
-    population_fitness = calculate_fitness_population(
-        population,
-        dict_processing_time,
-        dict_setup_matrices,
-        due_dates_dict,
-        priority_weights_dict,
-        buffer_time
-    )
-
-    # Update best individual
-    current_best_idx = np.argmin(population_fitness)
-    if population_fitness[current_best_idx] < best_fitness:
-        best_fitness = population_fitness[current_best_idx]
-        best_individual = deepcopy(population[current_best_idx])
-        generations_without_improvement = 0
-    else:
-        generations_without_improvement += 1
-
-    # Record metrics
-    history['best_fitness'].append(best_fitness)
-    history['avg_fitness'].append(np.mean(population_fitness))
-
-    # 2. Tournament Selection
-    selected_parents = rank_selection(
-        population,
-        len(population) // 2, 1.8,
-        population_fitness)
-
-    # 3. Crossover
-    offspring = ox_crossover(selected_parents, dict_eligibility, jobs_list, 75)
-
-    # 4. Mutation
-    offspring = mutation(offspring, 0.01)
-
-    # 5. Evaluate offspring
-    offspring_fitness = calculate_fitness_population(
-        offspring,
-        dict_processing_time,
-        dict_setup_matrices,
-        due_dates_dict,
-        priority_weights_dict,
-        buffer_time
-    )
-
-    # 6. Replacement with elitism
-    population = simple_replacement(
-        population,
-        offspring,
-        population_fitness,
-        offspring_fitness
-    )
-    
-    # Reactivation
-    if generations_without_improvement >= 20:
-        population = reactivate_population(population, population_fitness, 0.5)
-        generations_without_improvement = 0
-        print("Reactivation Performed")
+#=== GENETIC ALGORITHM ===#
 
-    # Save to appendix
-    print(f"Gen {gen}: Best={best_fitness:.2f}, Avg={np.mean(population_fitness):.2f}")
-    print(f"Genetic diversity {np.std(population_fitness):.2f}")
\ No newline at end of file
+def report_improvement(individual, fitness, generation, elapsed):
+    print(f"Gen {generation}: new best {fitness:.2f} after {elapsed:.1f}s")
+
+profiler = PhaseProfiler(PROFILE)
+with StatisticsSink(STATISTICS_PATH) as history:
+    result = solve(jobs_list, instance_data, due_dates_dict, dict_machines, dict_setup_matrices, buffer_time, GA_CONFIG,
+                   time_budget=TIME_BUDGET, target_fitness=TARGET_FITNESS, on_improvement=report_improvement,
+                   statistics=history, checkpoint_path=CHECKPOINT_PATH, checkpoint_interval=CHECKPOINT_INTERVAL,
+                   fitness_cache_size=FITNESS_CACHE_SIZE, profiler=profiler, label='main')
+
+best_individual = result['best_individual']
+best_fitness = result['best_fitness']
+print(f"Best={best_fitness:.2f} after {result['generations']} generations ({result['stop_reason']})")
+print(f"Fitness cache: {result['cache_statistics']}")
+if PROFILE:
+    print(profiler.summary().to_string(index=False))